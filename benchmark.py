@@ -0,0 +1,534 @@
+from argparse import ArgumentParser
+import subprocess
+import statistics
+import threading
+import time
+import sys
+import json
+
+"""Engine micro-benchmarks. Sample usage: python3 benchmark.py startup"""
+
+
+STARTUP_SCRIPT = '''
+import sys, time, json
+start = time.perf_counter()
+from src.game import Game
+game = Game(blue_path="bots/nothing_bot.py", red_path="bots/nothing_bot.py", map_path=sys.argv[1], output_path="replays/benchmark.awap25r")
+if sys.argv[2] == "render":
+    game.game_state.init_renderer()
+print(json.dumps({"seconds": time.perf_counter() - start, "pygame": "pygame" in sys.modules}))
+'''
+
+
+def bench_startup(args):
+    '''Time from a cold interpreter to a constructed Game, headless vs with the render stack imported'''
+
+    for mode in ["headless", "render"]:
+        samples = []
+        pygame_loaded = False
+
+        for _ in range(args.repeat):
+            out = subprocess.run(
+                [sys.executable, "-c", STARTUP_SCRIPT, args.map_path, mode], capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            samples.append(result["seconds"])
+            pygame_loaded = result["pygame"]
+
+        print(f"{mode:>8}: median {statistics.median(samples) * 1000:.1f} ms over {args.repeat} runs (pygame imported: {pygame_loaded})")
+
+
+def bench_turn_overhead(args):
+    '''Per-turn engine overhead of a full game with nothing_bot on both sides, plus the cost of one bot call'''
+
+    from src.game import Game
+    from src.player_worker import PlayerWorker
+
+    game = Game(
+        blue_path="bots/nothing_bot.py", red_path="bots/nothing_bot.py", map_path=args.map_path, output_path="replays/benchmark.awap25r"
+    )
+    game.turn_limit = args.turns
+
+    start = time.perf_counter()
+    game.run_game()
+    elapsed = time.perf_counter() - start
+    print(f"full game: {elapsed / game.game_state.turn * 1e6:.1f} us per turn over {game.game_state.turn} turns")
+
+    #isolate the cost of handing one turn to a bot: a new thread per call versus the persistent worker
+    player = game.blue_player
+    controller = game.blue_controller
+
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        thread = threading.Thread(target=player.play_turn, args=[controller], daemon=True)
+        thread.start()
+        thread.join(1)
+    thread_per_call = (time.perf_counter() - start) / args.calls
+
+    #run_game stopped the game's workers, so the persistent worker is timed on a fresh one
+    worker = PlayerWorker(player, controller, "benchmark-worker")
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        done, _ = worker.play_turn(1)
+        assert done, "the worker did not finish a turn of nothing_bot within a second"
+    worker_per_call = (time.perf_counter() - start) / args.calls
+    worker.stop()
+
+    print(f"thread per call: {thread_per_call * 1e6:.1f} us, persistent worker: {worker_per_call * 1e6:.1f} us")
+
+
+def bench_replay_formats(args):
+    '''Size and encode/decode speed of the JSON and binary replay formats, for one game on each map'''
+
+    import glob
+    import os
+    import contextlib
+    import io
+    from src.game import Game
+    from src.replay import DeltaReplayRecorder
+    from src.replay_binary import encode_replay, decode_replay
+
+    map_paths = args.maps if args.maps else sorted(glob.glob("maps/*.awap25m"))
+
+    print(f"{'map':>30} {'turns':>6} {'json':>9} {'delta':>9} {'bin':>9} {'zlib':>9} {'lzma':>9}   zlib enc/dec ms   lzma enc/dec ms")
+
+    for map_path in map_paths:
+        output_path = "replays/benchmark.awap25r"
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = Game(blue_path=args.blue, red_path=args.red, map_path=map_path, output_path=output_path)
+            game.turn_limit = args.turns
+            game.run_game()
+
+        with open(output_path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+
+        delta = DeltaReplayRecorder()
+        for step in data["replay"]:
+            delta.record(step)
+        delta_data = {key: value for key, value in data.items() if key != "replay"}
+        delta_data.update(delta.export_data())
+        delta_size = len(json.dumps(delta_data, separators=(',', ':')))
+
+        sizes = {}
+        timings = {}
+        for compression in ["none", "zlib", "lzma"]:
+            start = time.perf_counter()
+            blob = encode_replay(data, compression)
+            encoded = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decoded = decode_replay(blob)
+            decoded_time = time.perf_counter() - start
+
+            if decoded != data:
+                raise RuntimeError(f"{compression} binary replay of {map_path} does not round trip")
+
+            sizes[compression] = len(blob)
+            timings[compression] = (encoded * 1000, decoded_time * 1000)
+
+        name = os.path.basename(map_path)
+        kb = lambda size: f"{size / 1024:.1f}K"
+        print(
+            f"{name:>30} {len(data['replay']):>6} {kb(len(raw)):>9} {kb(delta_size):>9} {kb(sizes['none']):>9} {kb(sizes['zlib']):>9} {kb(sizes['lzma']):>9}"
+            f"   {timings['zlib'][0]:>6.1f} / {timings['zlib'][1]:<6.1f}   {timings['lzma'][0]:>6.1f} / {timings['lzma'][1]:<6.1f}"
+        )
+
+
+def bench_state_reads(args):
+    '''Cost of RobotController.get_units / get_buildings with many objects: read-only views vs the old deep copies'''
+
+    import copy
+    from src.game_state import GameState
+    from src.map_processor import process_map
+    from src.robot_controller import RobotController
+    from src.game_constants import Team, UnitType
+
+    game_state = GameState(process_map(args.map_path))
+    controller = RobotController(Team.BLUE, game_state)
+
+    #fill the map with units on every free tile, like a late game
+    placed = 0
+    for x in range(game_state.map.width):
+        for y in range(game_state.map.height):
+            if placed < args.units and game_state.is_unit_placeable(UnitType.KNIGHT, x, y):
+                game_state.place_unit(Team.BLUE, UnitType.KNIGHT, x, y)
+                placed += 1
+
+    units = list(game_state.units[Team.BLUE].values())
+    buildings = list(game_state.buildings[Team.BLUE].values())
+
+    def timed(func) -> float:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            func()
+        return (time.perf_counter() - start) / args.calls
+
+    deep_units = timed(lambda: copy.deepcopy(units))
+    view_units = timed(lambda: controller.get_units(Team.BLUE))
+    deep_buildings = timed(lambda: copy.deepcopy(buildings))
+    view_buildings = timed(lambda: controller.get_buildings(Team.BLUE))
+
+    print(f"get_units with {len(units)} units: deepcopy {deep_units * 1e6:.1f} us, views {view_units * 1e6:.1f} us ({deep_units / view_units:.0f}x)")
+    print(f"get_buildings with {len(buildings)} buildings: deepcopy {deep_buildings * 1e6:.1f} us, views {view_buildings * 1e6:.1f} us ({deep_buildings / view_buildings:.0f}x)")
+
+
+def bench_spatial_queries(args):
+    '''Radius queries with growing unit counts: spatial grid index vs scanning every unit of the team'''
+
+    import random
+    from src.game_state import GameState
+    from src.map_processor import process_map
+    from src.robot_controller import RobotController
+    from src.game_constants import Team, UnitType
+
+    print(f"{'units':>7} {'scan us/query':>14} {'grid us/query':>14} {'speedup':>8}")
+
+    for count in args.units:
+        game_state = GameState(process_map(args.map_path))
+        controller = RobotController(Team.BLUE, game_state)
+
+        free = [
+            (x, y) for x in range(game_state.map.width) for y in range(game_state.map.height)
+            if game_state.is_unit_placeable(UnitType.KNIGHT, x, y)
+        ]
+        rng = random.Random(0)
+        for x, y in rng.sample(free, min(count, len(free))):
+            game_state.place_unit(Team.RED, UnitType.KNIGHT, x, y)
+
+        units = list(game_state.units[Team.RED].values())
+        centers = [(unit.x, unit.y) for unit in units]
+
+        #the per-unit loop the controller used before the index
+        start = time.perf_counter()
+        for x, y in centers:
+            [unit for unit in units if max(abs(unit.x - x), abs(unit.y - y)) <= args.radius]
+        scan = (time.perf_counter() - start) / len(centers)
+
+        start = time.perf_counter()
+        for x, y in centers:
+            controller.sense_units_within_radius(Team.RED, x, y, args.radius)
+        grid = (time.perf_counter() - start) / len(centers)
+
+        print(f"{len(units):>7} {scan * 1e6:>14.1f} {grid * 1e6:>14.1f} {scan / grid:>7.1f}x")
+
+
+def bench_entity_store(args):
+    '''start_turn and radius query cost with growing unit counts: plain objects vs the columnar NumPy store'''
+
+    import random
+    from src.game_state import GameState
+    from src.map_processor import process_map
+    from src.game_constants import Team, UnitType
+
+    print(f"{'units':>7} {'mode':>9} {'start_turn us':>14} {'query us':>9}")
+
+    for count in args.units:
+        for columnar in [False, True]:
+            game_state = GameState(process_map(args.map_path), columnar=columnar)
+
+            free = [
+                (x, y) for x in range(game_state.map.width) for y in range(game_state.map.height)
+                if game_state.is_unit_placeable(UnitType.KNIGHT, x, y)
+            ]
+            rng = random.Random(0)
+            for i, (x, y) in enumerate(rng.sample(free, min(count, len(free)))):
+                game_state.place_unit(Team.BLUE if i % 2 else Team.RED, UnitType.KNIGHT, x, y)
+
+            start = time.perf_counter()
+            for _ in range(args.turns):
+                game_state.start_turn()
+            start_turn = (time.perf_counter() - start) / args.turns
+
+            centers = [(unit.x, unit.y) for unit in game_state.units[Team.RED].values()]
+            start = time.perf_counter()
+            for x, y in centers:
+                game_state.units_within_radius(Team.BLUE, x, y, args.radius)
+            query = (time.perf_counter() - start) / len(centers)
+
+            mode = "columnar" if columnar else "objects"
+            print(f"{count:>7} {mode:>9} {start_turn * 1e6:>14.1f} {query * 1e6:>9.1f}")
+
+
+def bench_attacks(args):
+    '''
+    Differential check of the batched unit_attack_location of columnar games against the per object loop:
+    the same random attacks on the same crowded skirmishes must leave identical states, in columnar games that
+    batch every attack as well as in ones that only batch from GameState.BATCH_ATTACK_MIN_HITS hits; also times them
+    '''
+
+    import random
+    from src.robot_controller import RobotController
+    from src.game_constants import Team
+    from src.attack_scenarios import attack_scenario, attack_state
+
+    modes = ["objects", "columnar", "always batched"]
+    timings = {mode: 0.0 for mode in modes}
+    attacks = 0
+
+    for seed in range(args.scenarios):
+        game_states = {mode: attack_scenario(args.map_path, mode != "objects", seed, args.damage_range) for mode in modes}
+        game_states["always batched"].BATCH_ATTACK_MIN_HITS = 0
+        controllers = {mode: {team: RobotController(team, game_state) for team in Team} for mode, game_state in game_states.items()}
+        rng = random.Random(seed)
+        order = list(modes) #shuffled every attack so no mode always runs on a cold cache
+
+        for step in range(args.steps):
+            reference = game_states["objects"]
+            team = rng.choice(list(Team))
+            if not reference.units[team]:
+                break
+            if step % 10 == 9:
+                for game_state in game_states.values():
+                    game_state.start_turn()
+
+            unit = reference.units[team][rng.choice(list(reference.units[team]))]
+            x = unit.x + rng.randint(-unit.attack_range, unit.attack_range)
+            y = unit.y + rng.randint(-unit.attack_range, unit.attack_range)
+
+            results = {}
+            rng.shuffle(order)
+            for mode in order:
+                start = time.perf_counter()
+                results[mode] = controllers[mode][team].unit_attack_location(unit.id, x, y)
+                timings[mode] += time.perf_counter() - start
+            attacks += 1
+
+            expected = attack_state(reference)
+            for mode in modes[1:]:
+                if results[mode] != results["objects"] or attack_state(game_states[mode]) != expected:
+                    print(f"MISMATCH ({mode}): scenario {seed}, attack {step} by unit {unit.id} on ({x}, {y})")
+                    sys.exit(1)
+
+    print(f"{attacks} attacks over {args.scenarios} scenarios: identical results")
+    print(", ".join(f"{mode} {timings[mode] / attacks * 1e6:.1f} us/attack" for mode in modes))
+
+
+def naive_path(game_state, unit, target_x: int, target_y: int):
+    '''The search bots hand roll: a heap of (cost, x, y, path) that copies the path on every push'''
+
+    import heapq
+    from src.game_constants import Direction
+
+    heap = [(0, unit.x, unit.y, [])]
+    done = set()
+    while heap:
+        cost, x, y, path = heapq.heappop(heap)
+        if (x, y) == (target_x, target_y):
+            return cost, path
+        if (x, y) in done:
+            continue
+        done.add((x, y))
+        for direction in Direction:
+            new_x, new_y = x + direction.dx, y + direction.dy
+            if direction == Direction.STAY or not game_state.map.in_bounds(new_x, new_y) or (new_x, new_y) in done:
+                continue
+            tile = game_state.map.tiles[new_x][new_y]
+            if tile not in unit.type.walkable_tiles or not game_state.unit_placeable_map[new_x][new_y]:
+                continue
+            heapq.heappush(heap, (cost + tile.movement_cost, new_x, new_y, path + [(new_x, new_y)]))
+    return None, None
+
+
+def bench_pathfinding(args):
+    '''
+    RobotController.get_shortest_path against a hand rolled heap search on a crowded map; distances must match.
+    Cold queries are the first from a unit this turn, cached ones repeat a unit with other targets
+    '''
+
+    import random
+    from src.game_state import GameState
+    from src.map_processor import process_map
+    from src.robot_controller import RobotController
+    from src.game_constants import Team, UnitType
+
+    game_state = GameState(process_map(args.map_path))
+    controller = RobotController(Team.BLUE, game_state)
+    rng = random.Random(0)
+
+    free = [
+        (x, y) for x in range(game_state.map.width) for y in range(game_state.map.height)
+        if game_state.is_unit_placeable(UnitType.KNIGHT, x, y)
+    ]
+    for i, (x, y) in enumerate(rng.sample(free, min(args.units, len(free)))):
+        game_state.place_unit(Team.BLUE if i % 2 else Team.RED, rng.choice([UnitType.KNIGHT, UnitType.EXPLORER]), x, y)
+
+    units = list(game_state.units[Team.BLUE].values())
+    queries = [
+        (rng.choice(units), rng.randrange(game_state.map.width), rng.randrange(game_state.map.height))
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    naive = [naive_path(game_state, unit, x, y) for unit, x, y in queries]
+    naive_time = time.perf_counter() - start
+
+    #cold: a fresh cache per query
+    start = time.perf_counter()
+    for unit, x, y in queries:
+        game_state.occupancy_version += 1
+        controller.get_shortest_path(unit.id, x, y)
+    cold_time = time.perf_counter() - start
+
+    #cached: warm up once per unit, then time the same queries again
+    for unit, x, y in queries:
+        controller.get_shortest_path(unit.id, x, y)
+    start = time.perf_counter()
+    paths = [controller.get_shortest_path(unit.id, x, y) for unit, x, y in queries]
+    cached_time = time.perf_counter() - start
+
+    for (unit, x, y), (cost, _), path in zip(queries, naive, paths):
+        distance = controller.get_path_distance(unit.id, x, y)
+        #the path must be king moves whose entry costs add up to the distance
+        steps = [(unit.x, unit.y)] + (path or [])
+        path_cost = sum(game_state.map.tiles[step_x][step_y].movement_cost for step_x, step_y in steps[1:])
+        adjacent = all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(steps, steps[1:]))
+        if distance != cost or (path is not None and (path_cost != distance or not adjacent or steps[-1] != (x, y))):
+            print(f"MISMATCH: unit {unit.id} at ({unit.x}, {unit.y}) to ({x}, {y}): {cost} vs {distance}")
+            sys.exit(1)
+
+    reachable = sum(1 for cost, _ in naive if cost is not None)
+    print(f"{len(queries)} queries ({reachable} reachable) from {len(units)} units on {args.map_path}: identical distances")
+    print(f"heap with path copies {naive_time / len(queries) * 1e6:.0f} us/query")
+    print(f"pathfinder, cold {cold_time / len(queries) * 1e6:.0f} us/query ({naive_time / cold_time:.1f}x)")
+    print(f"pathfinder, cached {cached_time / len(queries) * 1e6:.1f} us/query ({naive_time / cached_time:.0f}x)")
+
+
+def bench_legal_moves(args):
+    '''
+    unit_possible_move_directions from the engine's legal move cache against checking all nine directions with
+    can_move_unit_in_direction; after every random move, spawn or death the cache must still match the checks
+    '''
+
+    import random
+    from src.game_state import GameState
+    from src.map_processor import process_map
+    from src.robot_controller import RobotController
+    from src.game_constants import Team, UnitType, Direction, Tile
+
+    game_state = GameState(process_map(args.map_path))
+    controller = RobotController(Team.BLUE, game_state)
+    rng = random.Random(0)
+    water = [(x, y) for x in range(game_state.map.width) for y in range(game_state.map.height) if game_state.map.tiles[x][y] == Tile.WATER]
+
+    free = [
+        (x, y) for x in range(game_state.map.width) for y in range(game_state.map.height)
+        if game_state.is_unit_placeable(UnitType.KNIGHT, x, y)
+    ]
+    for i, (x, y) in enumerate(rng.sample(free, min(args.units, len(free)))):
+        game_state.place_unit(Team.BLUE if i % 2 else Team.RED, rng.choice([UnitType.KNIGHT, UnitType.EXPLORER, UnitType.RAT]), x, y)
+    game_state.start_turn()
+
+    def checked(unit_id: int) -> list:
+        return [direction for direction in Direction if controller.can_move_unit_in_direction(unit_id, direction)]
+
+    unit_ids = list(game_state.units[Team.BLUE])
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for unit_id in unit_ids:
+            checked(unit_id)
+    checks = (time.perf_counter() - start) / (args.repeat * len(unit_ids))
+
+    controller.unit_possible_move_directions(unit_ids[0]) #first use in the turn builds the cache
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for unit_id in unit_ids:
+            controller.unit_possible_move_directions(unit_id)
+    cached = (time.perf_counter() - start) / (args.repeat * len(unit_ids))
+
+    #churn: every change is followed by a full comparison
+    for step in range(args.changes):
+        blue_ids = list(game_state.units[Team.BLUE])
+        action = rng.random()
+        if action < 0.6 and blue_ids:
+            controller.move_unit_in_direction(rng.choice(blue_ids), rng.choice(list(Direction)))
+        elif action < 0.65 and water:
+            game_state.build_bridge(*water.pop(rng.randrange(len(water))))
+        elif action < 0.8:
+            x, y = rng.choice(free)
+            if game_state.is_unit_placeable(UnitType.KNIGHT, x, y):
+                game_state.place_unit(rng.choice(list(Team)), UnitType.KNIGHT, x, y)
+        else:
+            team = rng.choice(list(Team))
+            if game_state.units[team]:
+                game_state.delete_unit(team, rng.choice(list(game_state.units[team])))
+        if step % 50 == 49:
+            game_state.start_turn()
+
+        for unit_id in game_state.units[Team.BLUE]:
+            if controller.unit_possible_move_directions(unit_id) != checked(unit_id):
+                print(f"MISMATCH after change {step}: unit {unit_id}")
+                sys.exit(1)
+
+    print(f"{len(unit_ids)} blue units on {args.map_path}, {args.changes} random changes: legal moves always matched")
+    print(f"nine can_move_unit_in_direction checks {checks * 1e6:.1f} us/unit, cached {cached * 1e6:.2f} us/unit ({checks / cached:.0f}x)")
+
+
+def main():
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    startup = subparsers.add_parser("startup", help="cold start time of a Game with and without pygame")
+    startup.add_argument("-m", "--map_path", type=str, default="maps/simple_map.awap25m")
+    startup.add_argument("-n", "--repeat", type=int, default=10)
+    startup.set_defaults(func=bench_startup)
+
+    turn_overhead = subparsers.add_parser("turn_overhead", help="engine overhead per turn with bots that do nothing")
+    turn_overhead.add_argument("-m", "--map_path", type=str, default="maps/simple_map.awap25m")
+    turn_overhead.add_argument("-t", "--turns", type=int, default=3000)
+    turn_overhead.add_argument("-n", "--calls", type=int, default=5000)
+    turn_overhead.set_defaults(func=bench_turn_overhead)
+
+    replay_formats = subparsers.add_parser("replay_formats", help="replay size and encode/decode speed per format")
+    replay_formats.add_argument("-m", "--maps", type=str, nargs="+", default=None, help="default: every map in maps/")
+    replay_formats.add_argument("-b", "--blue", type=str, default="bots/attack_bot_v1.py")
+    replay_formats.add_argument("-r", "--red", type=str, default="bots/DanielsCode.py")
+    replay_formats.add_argument("-t", "--turns", type=int, default=1000)
+    replay_formats.set_defaults(func=bench_replay_formats)
+
+    state_reads = subparsers.add_parser("state_reads", help="cost of the RobotController getters with many units")
+    state_reads.add_argument("-m", "--map_path", type=str, default="maps/big_map.awap25m")
+    state_reads.add_argument("-u", "--units", type=int, default=500)
+    state_reads.add_argument("-n", "--calls", type=int, default=200)
+    state_reads.set_defaults(func=bench_state_reads)
+
+    spatial_queries = subparsers.add_parser("spatial_queries", help="radius query cost as the number of units grows")
+    spatial_queries.add_argument("-m", "--map_path", type=str, default="maps/big_map.awap25m")
+    spatial_queries.add_argument("-u", "--units", type=int, nargs="+", default=[50, 100, 200, 400, 800, 1600])
+    spatial_queries.add_argument("-r", "--radius", type=int, default=2)
+    spatial_queries.set_defaults(func=bench_spatial_queries)
+
+    entity_store = subparsers.add_parser("entity_store", help="start_turn and radius query cost, plain objects vs columnar store")
+    entity_store.add_argument("-m", "--map_path", type=str, default="maps/big_map.awap25m")
+    entity_store.add_argument("-u", "--units", type=int, nargs="+", default=[100, 400, 1000, 2000])
+    entity_store.add_argument("-r", "--radius", type=int, default=2)
+    entity_store.add_argument("-t", "--turns", type=int, default=200)
+    entity_store.set_defaults(func=bench_entity_store)
+
+    attacks = subparsers.add_parser("attacks", help="batched unit attacks of columnar games vs the per object loop (must match)")
+    attacks.add_argument("-m", "--map_path", type=str, default="maps/big_map.awap25m")
+    attacks.add_argument("-s", "--scenarios", type=int, default=200)
+    attacks.add_argument("-n", "--steps", type=int, default=100)
+    attacks.add_argument("-d", "--damage_range", type=int, default=2, help="largest damage range given to the units")
+    attacks.set_defaults(func=bench_attacks)
+
+    pathfinding = subparsers.add_parser("pathfinding", help="engine shortest paths vs a hand rolled heap search (must match)")
+    pathfinding.add_argument("-m", "--map_path", type=str, default="maps/big_map.awap25m")
+    pathfinding.add_argument("-u", "--units", type=int, default=300)
+    pathfinding.add_argument("-n", "--queries", type=int, default=300)
+    pathfinding.set_defaults(func=bench_pathfinding)
+
+    legal_moves = subparsers.add_parser("legal_moves", help="cached unit_possible_move_directions vs per direction checks (must match)")
+    legal_moves.add_argument("-m", "--map_path", type=str, default="maps/big_map.awap25m")
+    legal_moves.add_argument("-u", "--units", type=int, default=400)
+    legal_moves.add_argument("-n", "--repeat", type=int, default=20)
+    legal_moves.add_argument("-c", "--changes", type=int, default=1000)
+    legal_moves.set_defaults(func=bench_legal_moves)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from src.replay import convert_stream, convert_to_stream, load_replay
+from src.replay_binary import encode_replay, COMPRESSION
+from argparse import ArgumentParser
+import json
+
+"""
+Converts between replay formats:
+  - a replay stream (.awap25s, written with --stream_replay) into the .awap25r JSON read by the viewers,
+    also for the stream of a game that crashed, up to the last turn written
+  - a .awap25r JSON replay (full or delta) into a compact binary replay (.awap25b), and back
+  - any replay into an indexed replay stream (.awap25s), which replay_game_cli.py can open at any turn
+Sample usage: python3 convert_replay.py replays/game_replay.awap25s replays/game_replay.awap25r
+              python3 convert_replay.py replays/game_replay.awap25r replays/game_replay.awap25b
+              python3 convert_replay.py replays/game_replay.awap25r replays/game_replay.awap25s
+"""
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("input_file", type=str)
+    parser.add_argument("output_file", type=str)
+    parser.add_argument(
+        "--compression", type=str, choices=list(COMPRESSION), default="zlib",
+        help="Compression of binary replays (default: zlib)"
+    )
+
+    args = parser.parse_args()
+
+    if args.input_file.endswith(".awap25s"):
+        convert_stream(args.input_file, args.output_file)
+        return
+
+    data = load_replay(args.input_file)
+
+    if args.output_file.endswith(".awap25s"):
+        convert_to_stream(data, args.output_file)
+    elif args.output_file.endswith(".awap25b"):
+        with open(args.output_file, 'wb') as f:
+            f.write(encode_replay(data, args.compression))
+    else:
+        with open(args.output_file, 'w') as f:
+            json.dump(data, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,14 @@ import os
 import time
 import json
 
+from src.replay import load_replay, SeekableReplay
+
 """
 Displays a replay in the terminal via ASCII
 Sample usage: python3 replay_game_cli.py game_replay.awap25r
+Start from a later turn with: python3 replay_game_cli.py game_replay.awap25s 2500
+Only replay streams (.awap25s, from --stream_replay) can be started from a later turn: they are indexed, so they open at
+any turn without reading the rest of the file. Other replays can be turned into one with convert_replay.py
 """
 # ANSI color codes
 COLOR_MAP = {
@@ -55,23 +60,36 @@ def render_game_state(game_state, map_data):
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python3 replay_game_cli.py <replay_file>")
+        print("Usage: python3 replay_game_cli.py <replay_file> [start_turn]")
         return
 
     replay_file = sys.argv[1]
-    with open(replay_file, "r") as f:
-        data = json.load(f)
-
-    map_data = data["map"]
-    replay = data["replay"]
+    start_turn = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    if replay_file.endswith(".awap25s"):
+        replay = SeekableReplay(replay_file)
+        map_data = replay.map
+        steps = (replay.turn(i) for i in range(max(start_turn - 1, 0), len(replay)))
+        winner_color = replay.winner_color
+    elif len(sys.argv) > 2:
+        stream_file = os.path.splitext(replay_file)[0] + ".awap25s"
+        print(f"{replay_file} is not a replay stream, so it cannot be opened at a turn. Convert it once with")
+        print(f"  python3 convert_replay.py {replay_file} {stream_file}")
+        print(f"and open {stream_file} instead, or record games with --stream_replay")
+        return
+    else:
+        data = load_replay(replay_file)
+        map_data = data["map"]
+        steps = data["replay"][max(start_turn - 1, 0):]
+        winner_color = data["winner_color"]
 
-    for step in replay:
+    for step in steps:
         clear_screen()
         print(f"Turn {step['turn_number']}")
         render_game_state(step["game_state"], map_data)
         time.sleep(1)
 
-    print(f"Winner: {data['winner_color']}")
+    print(f"Winner: {winner_color}")
 
 
 if __name__ == "__main__":
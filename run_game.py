@@ -1,4 +1,6 @@
 from src.game import Game
+from src.result_cache import ResultCache
+from src.diagnostics import Level
 from argparse import ArgumentParser
 import json
 
@@ -27,6 +29,54 @@ def main():
         help="Whether or not to display the game while it is running",
     )
 
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="Run each bot in its own subprocess, charged cpu time and killed if it runs out",
+    )
+
+    parser.add_argument(
+        "--replay_format",
+        choices=["full", "delta"],
+        default="full",
+        help="full: every turn's whole game state; delta: keyframe plus per-turn changes (much smaller)",
+    )
+
+    parser.add_argument(
+        "--stream_replay",
+        action="store_true",
+        help="Write the replay to disk as turns complete (.awap25s next to the output file), then convert it",
+    )
+
+    parser.add_argument(
+        "--metrics_file",
+        type=str,
+        required=False,
+        default=None,
+        help="Write the time spent per turn in start_turn, each bot and serialization to this JSON lines file",
+    )
+
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Keep unit and building numbers in NumPy arrays; slower in normal games, only faster past about 400 units (see README)",
+    )
+
+    parser.add_argument(
+        "--diagnostics",
+        choices=[level.name.lower() for level in Level],
+        default="info",
+        help="Engine messages to show (rejected actions are info), each at most 10 times, with a count of every message at the end",
+    )
+
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        required=False,
+        default=None,
+        help="Reuse the result and replay of an earlier game with the same bots, map and engine (e.g. replays/cache)",
+    )
+
     parser.add_argument( 
         "-o", "--output_file", type=str, required=False, default="replays/game_replay.awap25r" # AWAP format (used for CLI view)
     )
@@ -58,12 +108,27 @@ def main():
         red_path = args.red_path
         map_path = args.map_path
 
+    cache = None
+    if args.cache_dir and not render:
+        cache = ResultCache(args.cache_dir)
+        key = cache.key(blue_path, red_path, map_path, {"isolate_bots": args.isolate, "replay_format": args.replay_format})
+
+        cached = cache.get(key, args.output_file)
+        if cached is not None:
+            print(f"{cached['winner']} WINS (cached result, replay copied to {args.output_file})")
+            return
+
     game = Game(
-        blue_path=blue_path, red_path=red_path, map_path=map_path, output_path=args.output_file, render=render
+        blue_path=blue_path, red_path=red_path, map_path=map_path, output_path=args.output_file, render=render, isolate_bots=args.isolate,
+        replay_format=args.replay_format, stream_replay=args.stream_replay, metrics_path=args.metrics_file,
+        columnar=args.columnar, diagnostics_level=Level[args.diagnostics.upper()]
     )
     print("Game Start")
 
-    game.run_game()
+    winner = game.run_game()
+
+    if cache is not None:
+        cache.put(key, {"winner": winner.name if winner is not None else None, "turns": game.game_state.turn}, args.output_file)
 
 
 if __name__ == "__main__":
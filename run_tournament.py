@@ -0,0 +1,64 @@
+from src.tournament import run_tournament
+from argparse import ArgumentParser
+import glob
+
+"""CLI entry point to run every bot against every other bot on every map in parallel"""
+def main():
+
+    # command line arguments
+    parser = ArgumentParser()
+
+    parser.add_argument(
+        "-b", "--bots", type=str, nargs="+", required=False, default=None,
+        help="Bot files to play against each other (default: every bot in bots/)"
+    )
+
+    parser.add_argument(
+        "-m", "--maps", type=str, nargs="+", required=False, default=None,
+        help="Map files to play on (default: every map in maps/)"
+    )
+
+    parser.add_argument("-n", "--rounds", type=int, required=False, default=1)
+
+    parser.add_argument(
+        "-j", "--workers", type=int, required=False, default=None,
+        help="Number of worker processes (default: number of cores)"
+    )
+
+    parser.add_argument(
+        "--replay_dir", type=str, required=False, default="replays/tournament"
+    )
+
+    parser.add_argument(
+        "--isolate", action="store_true",
+        help="Run each bot in its own subprocess, charged cpu time and killed if it runs out"
+    )
+
+    parser.add_argument(
+        "--cache_dir", type=str, required=False, default=None,
+        help="Reuse the results of games whose bots, map and engine are unchanged (e.g. replays/cache)"
+    )
+
+    parser.add_argument(
+        "-o", "--output_file", type=str, required=False, default="replays/tournament_results.json"
+    )
+
+    args = parser.parse_args()
+
+    bot_paths = args.bots if args.bots else sorted(glob.glob("bots/*.py"))
+    map_paths = args.maps if args.maps else sorted(glob.glob("maps/*.awap25m"))
+
+    data = run_tournament(
+        bot_paths, map_paths, rounds=args.rounds, workers=args.workers, replay_dir=args.replay_dir, output_path=args.output_file, isolate_bots=args.isolate,
+        cache_dir=args.cache_dir
+    )
+
+    for name, record in sorted(data["summary"].items(), key=lambda item: -item[1]["wins"]):
+        print(f"{name}: {record['wins']}W {record['losses']}L {record['errors']}E over {record['games']} games, {record['time_used']:.2f}s bot time")
+
+    print(f"{data['games']} games ({data['cached']} cached) in {data['elapsed']:.2f}s on {data['workers']} workers ({data['games_per_second']:.2f} games/s)")
+    print(f"Results written to {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
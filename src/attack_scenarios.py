@@ -0,0 +1,61 @@
+''' crowded random skirmishes for checking and timing unit attacks, shared by benchmark.py and the tests '''
+
+import random
+from typing import List
+
+from src.game_state import GameState
+from src.map_processor import process_map
+from src.game_constants import Team, UnitType, BuildingType
+from src.units import Unit
+from src.buildings import Building
+
+
+def attack_scenario(map_path: str, columnar: bool, seed: int, max_damage_range: int = 2) -> GameState:
+    '''A crowded skirmish: both teams' units and red buildings packed around one spot, with boosted stats and ranges'''
+
+    #same ids in both modes
+    Unit.id_counter = 0
+    Building.id_counter = 0
+
+    game_state = GameState(process_map(map_path), columnar=columnar)
+    rng = random.Random(seed)
+
+    center_x, center_y = rng.randrange(game_state.map.width), rng.randrange(game_state.map.height)
+    window = [
+        (x, y) for x in range(center_x - 8, center_x + 9) for y in range(center_y - 8, center_y + 9)
+        if game_state.map.in_bounds(x, y)
+    ]
+
+    building_types = [building_type for building_type in BuildingType if building_type != BuildingType.MAIN_CASTLE]
+    for x, y in rng.sample(window, len(window) // 4):
+        building_type = rng.choice(building_types)
+        if game_state.is_building_placeable(building_type, x, y):
+            game_state.place_building(Team.RED, building_type, x, y)
+
+    for x, y in window:
+        unit_type = rng.choice(list(UnitType))
+        if rng.random() < 0.7 and game_state.is_unit_placeable(unit_type, x, y):
+            game_state.place_unit(rng.choice([Team.BLUE, Team.RED]), unit_type, x, y)
+
+    #explore style boosts, and area attacks, so hits, kills and retaliation all happen often
+    for team in Team:
+        for unit in game_state.units[team].values():
+            unit.damage += rng.randrange(5)
+            unit.defense += rng.randrange(3)
+            unit.attack_range = rng.randrange(1, 4)
+            unit.damage_range = rng.randrange(max_damage_range + 1)
+        for building in game_state.buildings[team].values():
+            building.defense += rng.randrange(3)
+            building.attack_range = rng.randrange(3)
+
+    game_state.start_turn()
+    return game_state
+
+
+def attack_state(game_state: GameState) -> List:
+    '''Everything an attack can change'''
+    return [
+        [unit.to_dict() for team in Team for unit in game_state.units[team].values()],
+        [building.to_dict() for team in Team for building in game_state.buildings[team].values()],
+        game_state.unit_id_map, game_state.building_id_map, game_state.unit_placeable_map, game_state.building_placeable_map,
+    ]
@@ -0,0 +1,60 @@
+''' engine messages about rejected actions: shown by level, rate limited per message, and counted for the end of the game '''
+
+from enum import IntEnum
+from typing import Dict
+
+
+class Level(IntEnum):
+    '''How important a message is; a Diagnostics shows messages at or above its level'''
+
+    DEBUG = 0
+    INFO = 1 # a bot's action or query was rejected (invalid id, out of bounds, ...)
+    WARNING = 2 # a bot's action failed unexpectedly
+    SILENT = 3 # shows nothing; messages are still counted
+
+
+class Diagnostics:
+    '''
+    Channel for the engine's messages to bot authors, replacing print in RobotController and GameState
+
+    A message is a format string, and its arguments are only formatted when it is shown, so a rejected call costs
+    a counter increment when nothing is shown. Each message is shown at most limit times per game; every call is
+    counted in counts, keyed by the unformatted message, so the rejection reasons of a game can be reported at the end
+
+    Silent by default, as in tournaments and benchmarks; run_game.py shows INFO and above
+    '''
+
+    def __init__(self, level: Level = Level.SILENT, limit: int = 10):
+        self.level = level
+        self.limit = limit
+        self.counts: Dict[str, int] = {}
+
+    def report(self, level: Level, message: str, *args):
+        count = self.counts.get(message, 0) + 1
+        self.counts[message] = count
+
+        if level < self.level or count > self.limit:
+            return
+        print(message.format(*args) if args else message)
+        if count == self.limit:
+            print(f"(not showing '{message}' again this game)")
+
+    def debug(self, message: str, *args):
+        self.report(Level.DEBUG, message, *args)
+
+    def info(self, message: str, *args):
+        self.report(Level.INFO, message, *args)
+
+    def warning(self, message: str, *args):
+        self.report(Level.WARNING, message, *args)
+
+    def merge(self, counts: Dict[str, int]):
+        '''Adds counts reported elsewhere (an isolated bot process) to this game's counts'''
+        for message, count in counts.items():
+            self.counts[message] = self.counts.get(message, 0) + count
+
+    def format_summary(self) -> str:
+        lines = [f"Engine messages ({sum(self.counts.values())} total):"]
+        for message, count in sorted(self.counts.items(), key=lambda item: (-item[1], item[0])):
+            lines.append(f"  {count:>8}  {message}")
+        return "\n".join(lines)
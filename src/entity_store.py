@@ -0,0 +1,224 @@
+''' struct-of-arrays storage of units and buildings backed by NumPy, for games with thousands of objects '''
+
+import numpy as np
+from typing import List, Dict, Tuple, Callable, Iterable
+
+from src.game_constants import Team
+from src.units import Unit
+from src.buildings import Building
+
+
+#per object numbers kept as arrays; everything else (enums, tile lists, level) stays on the objects
+COLUMNS = ["id", "team", "type_code", "x", "y", "health", "damage", "defense", "attack_range", "turn_actions_remaining", "turn_movement_remaining"]
+
+TEAM_CODES: Dict[Team, int] = {team: team.value for team in Team}
+
+
+class EntityStore:
+    '''
+    Keeps the numbers of every unit (or every building) of a game in parallel NumPy arrays, one row per object
+
+    Rows of deleted objects go on a free-list and are reused by the next object placed; alive marks the rows in use.
+    Per turn bookkeeping (resetting actions and movement, farm income) is then a single vectorized operation
+    over the first size rows instead of a Python loop over the objects. grid holds each team's row on each tile
+    (at most one unit and one building per tile), so radius queries only slice the window around the query point.
+
+    This only pays off in very large games (benchmark.py entity_store): reset_turn beats the loop over plain objects
+    past about 400 units, while radius queries and every field read through column_property stay slower than plain
+    objects at any size, the NumPy call overhead outweighing the few objects touched. It is kept for games with
+    thousands of objects and for batched operations such as GameState.resolve_unit_attack.
+    '''
+
+    def __init__(self, types: Iterable, width: int, height: int, capacity: int = 64):
+        self.types = list(types)
+        self.type_codes = {type: code for code, type in enumerate(self.types)}
+
+        self.capacity = capacity
+        for column in COLUMNS:
+            setattr(self, column, np.zeros(capacity, dtype=np.int64))
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.size = 0 #rows ever handed out; rows past size were never used
+        self.free_rows: List[int] = []
+        self.rows: Dict[int, int] = {} #object id -> row
+        self.grid = np.full((len(TEAM_CODES), width, height), -1, dtype=np.int64) #[team code][x][y] -> row, -1 if empty
+
+        #per type tables, indexed by type code
+        self.actions_per_turn = self.type_table(lambda type: type.actions_per_turn)
+        self.move_range = self.type_table(lambda type: getattr(type, "move_range", 0))
+
+    def type_table(self, value: Callable) -> np.ndarray:
+        '''Array of value(type) for every type, indexed by type code'''
+        return np.array([value(type) for type in self.types], dtype=np.int64)
+
+    def grow(self):
+        '''Doubles the capacity of every column'''
+        self.capacity *= 2
+        for column in COLUMNS + ["alive"]:
+            old = getattr(self, column)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def allocate(self, team: Team, type) -> int:
+        '''Takes a row for a new object, reusing a freed row if there is one'''
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.size == self.capacity:
+                self.grow()
+            row = self.size
+            self.size += 1
+
+        self.team[row] = TEAM_CODES[team]
+        self.type_code[row] = self.type_codes[type]
+        self.alive[row] = True
+        return row
+
+    def register(self, obj_id: int, row: int):
+        self.id[row] = obj_id
+        self.rows[obj_id] = row
+
+    def release(self, obj_id: int):
+        '''Frees the row of a deleted object'''
+        row = self.rows.pop(obj_id)
+        self.alive[row] = False
+        self.free_rows.append(row)
+
+    def reset_turn(self):
+        '''Sets every object's actions (and movement) remaining to its type's per turn values'''
+        n = self.size
+        type_codes = self.type_code[:n]
+        self.turn_actions_remaining[:n] = self.actions_per_turn[type_codes]
+        self.turn_movement_remaining[:n] = self.move_range[type_codes]
+
+    def team_total(self, team: Team, table: np.ndarray) -> int:
+        '''Sum of table[type] over the team's objects'''
+        n = self.size
+        mask = self.alive[:n] & (self.team[:n] == TEAM_CODES[team])
+        return int(table[self.type_code[:n][mask]].sum())
+
+    def count(self, team: Team) -> int:
+        n = self.size
+        return int(np.count_nonzero(self.alive[:n] & (self.team[:n] == TEAM_CODES[team])))
+
+    def rows_within_radius(self, team: Team, x: int, y: int, radius: int) -> np.ndarray:
+        '''Rows of the team's objects within chebyshev distance radius of (x, y), in increasing id order'''
+        if radius < 0:
+            return np.zeros(0, dtype=np.intp)
+
+        window = self.grid[TEAM_CODES[team], max(x - radius, 0):x + radius + 1, max(y - radius, 0):y + radius + 1]
+        rows = window[window >= 0]
+        if rows.size > 1:
+            rows = rows[np.argsort(self.id[rows])]
+        return rows
+
+    def within_radius(self, team: Team, x: int, y: int, radius: int) -> List[int]:
+        '''Ids of the team's objects within chebyshev distance radius of (x, y), in increasing id order'''
+        if radius < 0:
+            return []
+
+        #a query finds a handful of objects: sorting them as a list costs less than argsort and a second gather
+        window = self.grid[TEAM_CODES[team], max(x - radius, 0):x + radius + 1, max(y - radius, 0):y + radius + 1]
+        return sorted(self.id[window[window >= 0]].tolist())
+
+
+class ColumnarIndex:
+    '''
+    The SpatialIndex interface over a team's rows of an EntityStore
+
+    add, move and remove keep the store's grid of rows in sync; query slices the grid around the point.
+    GameState calls move before changing the object's position, so the old tile is still known.
+    '''
+
+    def __init__(self, store: EntityStore, team: Team):
+        self.store = store
+        self.team = team
+        self.team_code = TEAM_CODES[team]
+
+    def __len__(self) -> int:
+        return self.store.count(self.team)
+
+    def __contains__(self, obj_id: int) -> bool:
+        row = self.store.rows.get(obj_id)
+        return row is not None and self.store.team[row] == TEAM_CODES[self.team]
+
+    def add(self, obj_id: int, x: int, y: int):
+        self.store.grid[self.team_code, x, y] = self.store.rows[obj_id]
+
+    def remove(self, obj_id: int):
+        store = self.store
+        row = store.rows[obj_id]
+        store.grid[self.team_code, store.x[row], store.y[row]] = -1
+
+    def move(self, obj_id: int, x: int, y: int):
+        store = self.store
+        row = store.rows[obj_id]
+        store.grid[self.team_code, store.x[row], store.y[row]] = -1
+        store.grid[self.team_code, x, y] = row
+
+    def query(self, x: int, y: int, radius: int) -> List[int]:
+        return self.store.within_radius(self.team, x, y, radius)
+
+
+def column_property(column: str) -> property:
+    '''An attribute that reads and writes the object's row of a store column, as a plain int'''
+
+    def get(self):
+        return getattr(self.store, column).item(self.row)
+
+    def set(self, value):
+        getattr(self.store, column)[self.row] = value
+
+    return property(get, set)
+
+
+class ColumnarObject:
+    '''
+    Mixin for units and buildings whose numbers live in an EntityStore row
+
+    The objects keep the whole Unit / Building API (the store columns are properties), so the engine and
+    the RobotController use them unchanged.
+    '''
+
+    base_class: type = object
+    columns: List[str] = []
+
+    def view_snapshot(self) -> Tuple[type, Dict]:
+        '''The plain class and attribute values of the object, for read-only views'''
+        values = {key: value for key, value in self.__dict__.items() if key != "store" and key != "row"}
+        store, row = self.store, self.row
+        for column in self.columns:
+            values[column] = getattr(store, column).item(row)
+        return self.base_class, values
+
+
+class ColumnarUnit(ColumnarObject, Unit):
+    '''A Unit backed by a row of the game's unit store'''
+
+    base_class = Unit
+    columns = COLUMNS[3:]
+
+    def __init__(self, store: EntityStore, team: Team, type, x: int, y: int, level: int = 1):
+        self.store = store
+        self.row = store.allocate(team, type)
+        Unit.__init__(self, team, type, x, y, level)
+        store.register(self.id, self.row)
+
+
+class ColumnarBuilding(ColumnarObject, Building):
+    '''A Building backed by a row of the game's building store'''
+
+    base_class = Building
+    columns = COLUMNS[3:-1] #buildings do not move
+
+    def __init__(self, store: EntityStore, team: Team, type, x: int, y: int, level: int = 1, spawnable: bool = False):
+        self.store = store
+        self.row = store.allocate(team, type)
+        Building.__init__(self, team, type, x, y, level, spawnable)
+        store.register(self.id, self.row)
+
+
+for _columnar_class in [ColumnarUnit, ColumnarBuilding]:
+    for _column in _columnar_class.columns:
+        setattr(_columnar_class, _column, column_property(_column))
@@ -7,7 +7,6 @@ import uuid
 
 import sys
 import os
-from threading import Thread
 import time
 import copy
 from typing import List, Dict
@@ -17,6 +16,10 @@ from src.game_state import GameState
 from src.game_constants import Team, GameConstants
 from src.robot_controller import RobotController
 from src.player import Player
+from src.player_worker import PlayerWorker, ProcessPlayerWorker
+from src.replay import make_recorder, StreamingReplayRecorder, convert_stream, STREAM_KEYFRAME_INTERVAL
+from src.turn_metrics import TurnMetrics
+from src.diagnostics import Diagnostics, Level
 
 from src.map_processor import process_map
 
@@ -36,22 +39,66 @@ def import_file(module_name, file_path):
 
 
 class Game:
-    def __init__(self, blue_path: str, red_path: str, map_path: str, output_path: str, render= False):
+    def __init__(self, blue_path: str, red_path: str, map_path: str, output_path: str, render= False, isolate_bots= False, replay_format= "full", stream_replay= False, metrics_path= None, columnar= False, diagnostics_level= Level.SILENT):
         
         self.map = process_map(map_path)
-        self.game_state = GameState(map=self.map)
+        #engine messages about rejected actions; counted either way, shown from diagnostics_level up
+        self.game_state = GameState(map=self.map, columnar=columnar, diagnostics=Diagnostics(diagnostics_level))
 
         self.render = render
+        if self.render:
+            self.game_state.init_renderer()
         self.output_path = output_path
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
 
+        #initialize controller
+        self.blue_controller = RobotController(Team.BLUE, self.game_state)
+        self.red_controller = RobotController(Team.RED, self.game_state)
+
+        #one long-lived worker per bot that plays each turn on request
+        #no worker if the bot failed to initialize or has no play_turn (not inheriting Player)
+        self.workers: Dict[Team, PlayerWorker] = {}
+
+        self.isolate_bots = isolate_bots
+        if self.isolate_bots:
+            #each bot is imported and initialized in its own subprocess
+            self.blue_failed_init = not self.start_process_worker(Team.BLUE, blue_path, self.blue_controller)
+            self.red_failed_init = not self.start_process_worker(Team.RED, red_path, self.red_controller)
+        else:
+            self.start_thread_workers(blue_path, red_path)
+
+        self.replay_id = str(uuid.uuid4())
+        self.map = self.game_state.map.to_dict()
+
+        # To store turn-by-turn replay information
+        # when streaming, turns are written next to the output file as they complete and converted at the end
+        self.stream_replay = stream_replay
+        if self.stream_replay:
+            self.stream_path = os.path.splitext(output_path)[0] + ".awap25s"
+            self.replay = StreamingReplayRecorder(
+                self.stream_path, {"ID": self.replay_id, "map": self.map}, make_recorder(replay_format, STREAM_KEYFRAME_INTERVAL)
+            )
+            #map changes (bridges) are written to the stream as they happen instead of kept for the export
+            self.game_state.map_change_recorder = self.replay.record_map_change
+        else:
+            self.replay = make_recorder(replay_format)
+
+        #time spent per phase of each turn; written per turn to metrics_path if given
+        self.metrics = TurnMetrics(metrics_path)
+
+        self.turn_limit = 3000
+        self.winner = None 
+
+    def start_thread_workers(self, blue_path: str, red_path: str):
+        '''Imports and initializes both bots in the engine process, each with a worker thread'''
+
         #initialize players
         # NOTE: BotPlayer is the name of the class that the players input
         self.blue_failed_init = False
         try:
             blue_bot_name = os.path.basename(blue_path).split(".")[0]
-            self.blue_player: Player = import_file(blue_bot_name, blue_path).BotPlayer(copy.deepcopy(self.map))
+            self.blue_player: Player = import_file(blue_bot_name, blue_path).BotPlayer(self.map.snapshot())
         except Exception as e:
             print(f"Error initializing blue bot: {e}")
             blue_bot_name = "blue"
@@ -65,7 +112,7 @@ class Game:
         self.red_failed_init = False
         try:
             red_bot_name = os.path.basename(red_path).split(".")[0]
-            self.red_player: Player = import_file(red_bot_name, red_path).BotPlayer(copy.deepcopy(self.map))
+            self.red_player: Player = import_file(red_bot_name, red_path).BotPlayer(self.map.snapshot())
         except Exception as e:
             print(f"Error initializing red bot: {e}")
             red_bot_name = "red"
@@ -74,59 +121,81 @@ class Game:
             traceback.print_exc()
 
 
-        #initialize controller
-        self.blue_controller = RobotController(Team.BLUE, self.game_state)
-        self.red_controller = RobotController(Team.RED, self.game_state)
-        self.replay = []  # To store turn-by-turn replay information
-        self.map = self.game_state.map.to_dict()
+        if not self.blue_failed_init and hasattr(self.blue_player, "play_turn"):
+            self.workers[Team.BLUE] = PlayerWorker(self.blue_player, self.blue_controller, f"{blue_bot_name}-blue")
+        if not self.red_failed_init and hasattr(self.red_player, "play_turn"):
+            self.workers[Team.RED] = PlayerWorker(self.red_player, self.red_controller, f"{red_bot_name}-red")
 
-        self.turn_limit = 3000
-        self.winner = None 
+    def start_process_worker(self, team: Team, path: str, controller: RobotController) -> bool:
+        '''
+        Starts a bot in its own subprocess
+        Returns True if the bot initialized successfully
+        '''
+
+        bot_name = os.path.basename(path).split(".")[0]
+        worker = ProcessPlayerWorker(path, bot_name, team, self.map.snapshot(), self.game_state, controller, f"{bot_name}-{team.name.lower()}")
+
+        if not worker.ready:
+            worker.stop()
+            return False
+
+        if worker.has_play_turn:
+            self.workers[team] = worker
+        else:
+            worker.stop()
+
+        return True
+
+    def stop_workers(self):
+        '''Shuts down the bot workers once the game is over'''
+        for worker in self.workers.values():
+            worker.stop()
 
     def record_turn(self, turn_data: Dict):
         """Record data of the current turn into the replay."""
         # print(f'turn_data: {turn_data['game_state']['buildings']}')
-        self.replay.append(turn_data)
+        self.replay.record(turn_data)
 
     def export_replay(self, filename: str):
         self.replay.pop()
         """Export the replay object to a JSON file with the winner at the top level."""
+        if self.stream_replay:
+            self.replay.finish({"winner_color": self.winner})
+            convert_stream(self.stream_path, filename)
+            return
+
         replay_data = {
-            "ID": str(uuid.uuid4()),
+            "ID": self.replay_id,
             "map": self.map,
             "map-changes": {
                 "changed-turns": self.game_state.changed_turns,
                 "changed-maps": self.game_state.changed_maps
             },
             "winner_color": self.winner, 
-            "replay": self.replay
+            **self.replay.export_data()
         }
         with open(filename, 'w') as f:
-            json.dump(replay_data, f, indent=4)
+            if self.replay.replay_format == "full":
+                json.dump(replay_data, f, indent=4)
+            else:
+                #compact replays are not meant to be read by hand
+                json.dump(replay_data, f, separators=(',', ':'))
 
 
     def call_player_code(self, team: Team):
         '''Calls the player code of a given team'''
 
-        player: Player = self.blue_player if team == Team.BLUE else self.red_player
-        controller = self.blue_controller if team == Team.BLUE else self.red_controller
-
-        # Create a thread that runs player.play_turn.
-        # This function might not exist if the player code is broken, so we need to handle that.
-        try:
-            thread = Thread(target=player.play_turn, args=[controller], daemon=True)
-        except:
+        # The worker might not exist if the player code is broken, so we need to handle that.
+        worker = self.workers.get(team)
+        if worker is None:
             print(f"Failed to call player code for {team}. Are you inheriting the Player class?")
             return False
 
-        # Run in separate thread with time limit
-        func_time = time.time()
-        thread.start()
-        thread.join(self.game_state.time_remaining[team])
-        func_time = time.time() - func_time
+        # Run on the player's worker thread with time limit
+        finished, func_time = worker.play_turn(self.game_state.time_remaining[team])
 
-        # Check if thread timed out
-        if thread.is_alive() or func_time > self.game_state.time_remaining[team]:
+        # Check if the turn timed out
+        if not finished or func_time > self.game_state.time_remaining[team]:
             self.game_state.time_remaining[team] = 0
             return False
         
@@ -216,11 +285,16 @@ class Game:
         #add time to each player
         self.game_state.time_remaining[Team.BLUE] += GameConstants.ADDITIONAL_TIME_PER_TURN
         self.game_state.time_remaining[Team.RED] += GameConstants.ADDITIONAL_TIME_PER_TURN
+        self.metrics.lap("start_turn")
 
 
         #run player code, blue goes first then red
         blue_success = self.call_player_code(Team.BLUE)
+        self.metrics.lap("blue")
         red_success = self.call_player_code(Team.RED)
+        self.metrics.lap("red")
+
+        #the rest of the turn (end checks, to_dict and recording) is charged to serialization
 
         if not blue_success and not red_success:  # Both failed
             return self.calculate_winner()
@@ -255,22 +329,38 @@ class Game:
     def run_game(self) -> Optional[Team]:
         '''Initializes the bots and runs the game. Exports the JSON when finished'''
 
+        try:
+            return self.play_game()
+        finally:
+            self.stop_workers()
+
+            self.metrics.close()
+            if self.metrics.path is not None:
+                print(self.metrics.format_summary())
+
+            diagnostics = self.game_state.diagnostics
+            if diagnostics.level < Level.SILENT and diagnostics.counts:
+                print(diagnostics.format_summary())
+
+    def play_game(self) -> Optional[Team]:
+        '''Plays every turn of the game until there is a winner or the turn limit is reached'''
+
         # Check if we initialized players successfully
         if self.blue_failed_init and self.red_failed_init:
             print('Both blue and red failed to initialize. Nobody wins.')
             return None
         elif self.blue_failed_init:
             print("Blue failed to initialize. Red wins.")
-            self.replay.append({})
-            self.replay.append({})
-            self.replay[1]["winner_color"] = "RED"
+            self.record_turn({})
+            self.record_turn({})
+            self.winner = "RED"
             self.export_replay(self.output_path)
             return Team.RED
         elif self.red_failed_init:
             print("Red failed to initialize. Blue wins.")
-            self.replay.append({})
-            self.replay.append({})
-            self.replay[1]["winner_color"] = "BLUE"
+            self.record_turn({})
+            self.record_turn({})
+            self.winner = "BLUE"
             self.export_replay(self.output_path)
             return Team.BLUE
 
@@ -280,7 +370,9 @@ class Game:
                 self.game_state.render()
                 time.sleep(.1)
 
+            self.metrics.begin_turn()
             winner = self.run_turn()
+            self.metrics.end_turn(self.game_state.turn)
 
             if winner is not None:
                 self.export_replay(self.output_path) 
@@ -291,10 +383,12 @@ class Game:
                 return winner
             
 
+        #decide the winner first so it is in the replay; the extra turn it records is popped on export
+        winner = self.calculate_winner()
         self.export_replay(self.output_path)
 
         if self.render:
             self.game_state.render()
             
-        return self.calculate_winner()
+        return winner
             
\ No newline at end of file
@@ -118,6 +118,9 @@ class BuildingType (Enum):
         else:
             self.placeable_tiles = placeable_tiles #tiles that it can be placed on
 
+        #key of this type's placement bitmap in the per game rule tables (src/rule_tables.py)
+        self.placement_class = frozenset(self.placeable_tiles)
+
 
     #in the order of (health, cost, attack_range, damage_range, cooldown, damage, defense, actions_per_turn, coins_per_turn, spawnable, placeable_tiles)
 
@@ -153,6 +156,9 @@ class UnitType (Enum):
         else:
             self.walkable_tiles = walkable_tiles
 
+        #key of this type's passability bitmap in the per game rule tables (src/rule_tables.py)
+        self.walk_class = frozenset(self.walkable_tiles)
+
 
     #in the order of (health, cost, attack range, cooldown, damage, defense, actions_per_turn, move_range, damage range, heal_amount, [spawnable buildings])
 
@@ -199,6 +205,46 @@ class UnitType (Enum):
 
 
 
+'''
+-------------------------
+Batched Action Submission
+-------------------------
+'''
+
+
+class ActionType(Enum):
+    '''
+    Actions that can be submitted in a batch with RobotController.perform_actions, as (ActionType, *arguments) tuples
+    The value is the RobotController method that applies the action; the arguments are that method's
+    '''
+
+    MOVE = "move_unit_in_direction" # (unit_id, direction)
+
+    UNIT_ATTACK_LOCATION = "unit_attack_location" # (unit_id, x, y)
+    UNIT_ATTACK_UNIT = "unit_attack_unit" # (unit_id, target_unit_id)
+    UNIT_ATTACK_BUILDING = "unit_attack_building" # (unit_id, target_building_id)
+    BUILDING_ATTACK_LOCATION = "building_attack_location" # (building_id, x, y)
+    BUILDING_ATTACK_UNIT = "building_attack_unit" # (building_id, target_unit_id)
+
+    SPAWN = "spawn_unit" # (unit_type, building_id)
+    BUILD = "build_building" # (building_type, x, y)
+    HEAL = "heal_unit" # (healer_id, target_unit_id)
+    BUILD_BRIDGE = "build_bridge" # (engineer_id)
+    HARM_FARM = "harm_farm" # (rat_id, farm_id)
+
+    EXPLORE_FOR_GOLD = "explore_for_gold" # (explorer_id, explore_building_id)
+    EXPLORE_FOR_HEALTH = "explore_for_health" # (explorer_id, explore_building_id, target_unit_id)
+    EXPLORE_FOR_ATTACK = "explore_for_attack" # (explorer_id, explore_building_id, target_unit_id)
+    EXPLORE_FOR_DEFENSE = "explore_for_defense" # (explorer_id, explore_building_id, target_unit_id)
+
+    SELL_UNIT = "sell_unit" # (unit_id)
+    SELL_BUILDING = "sell_building" # (building_id)
+    DISBAND = "disband_unit" # (unit_id)
+    DESTROY = "destroy_building" # (building_id)
+
+
+
+
 
 
 '''
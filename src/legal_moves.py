@@ -0,0 +1,75 @@
+''' the directions each unit of the team playing can move in, kept up to date as units move, spawn and die '''
+
+from typing import List, Dict, Optional
+
+from src.game_constants import Team, Direction
+
+
+# (direction, dx, dy) in the order of Direction, so cached lists match iterating Direction
+DIRECTION_STEPS = [(direction, direction.dx, direction.dy) for direction in Direction]
+
+
+class LegalMoves:
+    '''
+    Legal move directions of every unit of one team, the same checks as RobotController.can_move_unit_in_direction
+
+    Built in one pass over the team's units the first time they are asked for in a bot's turn (team or turn changed).
+    A unit's moves only depend on its position, its movement left, the tiles around it and the units on them, so
+    GameState calls tile_changed when a unit is placed, moves or dies or a bridge is built, and only the units
+    on and around that tile are redone
+    '''
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.team: Optional[Team] = None
+        self.turn = -1
+        self.units = {}
+        self.moves: Dict[int, List[Direction]] = {}
+
+    def directions(self, team: Team, unit_id: int) -> Optional[List[Direction]]:
+        '''Legal directions of a unit of team, None if it is not one of team's units'''
+        if team is not self.team or self.turn != self.game_state.turn:
+            self.rebuild(team)
+        return self.moves.get(unit_id)
+
+    def rebuild(self, team: Team):
+        self.team = team
+        self.turn = self.game_state.turn
+        self.units = self.game_state.units[team]
+        self.moves = {unit_id: self.compute(unit) for unit_id, unit in self.units.items()}
+
+    def compute(self, unit) -> List[Direction]:
+        game_state = self.game_state
+        passable = game_state.rules.passable[unit.type.walk_class]
+        movement_cost = game_state.rules.movement_cost
+        unit_placeable_map = game_state.unit_placeable_map
+        width, height = game_state.map.width, game_state.map.height
+        x, y, movement = unit.x, unit.y, unit.turn_movement_remaining
+
+        moves = []
+        for direction, dx, dy in DIRECTION_STEPS:
+            dest_x, dest_y = x + dx, y + dy
+            if not (0 <= dest_x < width and 0 <= dest_y < height) or not passable[dest_x][dest_y]:
+                continue
+            if (dx or dy) and not unit_placeable_map[dest_x][dest_y]:
+                continue
+            if movement - movement_cost[dest_x][dest_y] < 0:
+                continue
+            moves.append(direction)
+        return moves
+
+    def tile_changed(self, x: int, y: int):
+        '''Redoes the moves of the team's units on (x, y) and its neighbors, adding units new to the cache'''
+        if self.turn != self.game_state.turn:
+            return #rebuilt on next use anyway
+
+        unit_id_map = self.game_state.unit_id_map
+        for unit_x in range(max(x - 1, 0), min(x + 2, self.game_state.map.width)):
+            for unit_y in range(max(y - 1, 0), min(y + 2, self.game_state.map.height)):
+                unit = self.units.get(unit_id_map[unit_x][unit_y])
+                if unit is not None:
+                    self.moves[unit.id] = self.compute(unit)
+
+    def unit_removed(self, unit_id: int, x: int, y: int):
+        self.moves.pop(unit_id, None)
+        self.tile_changed(x, y)
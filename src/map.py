@@ -3,7 +3,8 @@
 from src.exceptions import GameException
 
 from src.game_constants import Tile, TileColors, Team
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+from types import MappingProxyType
 
 class Map:
     '''
@@ -54,6 +55,31 @@ class Map:
         if not self.in_bounds(*blue_castle_loc) or not self.in_bounds(*red_castle_loc):
             raise GameException('Given main castle locations invalid')
 
+        #incremented on every tile change; the read-only snapshot handed to bots is rebuilt only when it changes
+        self.version = 0
+        self.frozen: Optional['FrozenMap'] = None
+
+    def set_tile(self, x: int, y: int, tile: Tile):
+        '''Changes the tile at (x, y), e.g. WATER to BRIDGE when a bridge is built'''
+        self.tiles[x][y] = tile
+        self.version += 1
+        self.frozen = None
+
+    def __getstate__(self):
+        #the snapshot is rebuilt on demand rather than copied or pickled along
+        state = dict(self.__dict__)
+        state["frozen"] = None
+        return state
+
+    def snapshot(self) -> 'FrozenMap':
+        '''
+        Returns an immutable copy of the map at its current version
+        The same snapshot is returned until a tile changes, so repeated calls cost nothing
+        '''
+        if self.frozen is None:
+            self.frozen = FrozenMap(self)
+        return self.frozen
+
     def in_bounds(self, x: int, y: int) -> bool:
         '''
         checks if self.tiles[x][y] is in bounds,
@@ -97,4 +123,50 @@ class Map:
         """
         Converts the map into a 2D list of tile names.
         """
-        return [[tile.name if hasattr(tile, 'name') else str(tile) for tile in row] for row in self.tiles]
\ No newline at end of file
+        return [[tile.name if hasattr(tile, 'name') else str(tile) for tile in row] for row in self.tiles]
+
+
+class FrozenMap(Map):
+    '''
+    A read-only snapshot of a Map, shared between the engine and both bots instead of deep copies
+
+    Tiles are a tuple of tuples and castle_locs a read-only mapping; setting any attribute raises GameException.
+    Copying or deep copying a snapshot returns the snapshot itself.
+    '''
+
+    def __init__(self, map: Map):
+        set_field = object.__setattr__
+
+        set_field(self, "width", map.width)
+        set_field(self, "height", map.height)
+        set_field(self, "tiles", tuple(tuple(column) for column in map.tiles))
+        set_field(self, "blue_castle_loc", map.blue_castle_loc)
+        set_field(self, "red_castle_loc", map.red_castle_loc)
+        set_field(self, "castle_locs", MappingProxyType(dict(map.castle_locs)))
+        set_field(self, "version", map.version)
+        set_field(self, "frozen", self)
+
+    def __setattr__(self, name, value):
+        raise GameException(f"Cannot set {name}: the map returned by the RobotController is read-only")
+
+    def __delattr__(self, name):
+        raise GameException(f"Cannot delete {name}: the map returned by the RobotController is read-only")
+
+    def set_tile(self, x: int, y: int, tile: Tile):
+        raise GameException("Cannot change tiles of the map returned by the RobotController")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        #mapping proxies cannot be pickled; rebuild the snapshot from a plain map
+        return (FrozenMap, (self.thaw(),))
+
+    def thaw(self) -> Map:
+        '''A mutable copy of the snapshot'''
+        map = Map(self.width, self.height, [list(column) for column in self.tiles], self.blue_castle_loc, self.red_castle_loc)
+        map.version = self.version
+        return map
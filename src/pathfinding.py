@@ -0,0 +1,275 @@
+''' shortest paths and walking distances for units, computed by the engine and kept in step with the map and unit positions '''
+
+import functools
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, FrozenSet
+
+from src.game_constants import Team, Tile, UnitType
+
+
+UNREACHABLE = -1
+
+# flow fields kept per game, least recently used dropped first; bots chasing moving units ask for a new target every turn
+FLOW_FIELD_CACHE_SIZE = 32
+
+# king moves, in a fixed order so ties between equally short paths are always broken the same way
+NEIGHBOR_OFFSETS = [(0, 1), (0, -1), (-1, 0), (1, 0), (-1, 1), (1, 1), (-1, -1), (1, -1)]
+
+
+@functools.lru_cache(maxsize=None)
+def neighbor_table(width: int, height: int) -> List[List[int]]:
+    '''
+    Tile number -> numbers of its in bounds neighbors
+    Shared by every caller with the same map size, as a Pathfinder is made every turn in isolated bot processes; never modify it
+    '''
+    return [
+        [
+            (x + dx) * height + (y + dy)
+            for dx, dy in NEIGHBOR_OFFSETS
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        ]
+        for x in range(width) for y in range(height)
+    ]
+
+
+def propagate(distance: List[int], parent: List[int], seeds: List[int], open_tiles: List[bool], movement_cost: List[int], neighbors: List[List[int]], toward_source: bool):
+    '''
+    Dijkstra from tiles whose distance is already set, lowering the distance and parent of every tile it improves
+    Moving onto a tile costs that tile's movement cost; with toward_source distances are of walks from each tile
+    to the seeds instead, so relaxing a neighbor costs the movement cost of the tile it steps onto
+
+    As movement costs are small integers of at least 1, the frontier is a bucket queue (a list of tiles per distance)
+    rather than a heap: a bucket is complete once it is reached
+    '''
+    base = min(distance[seed] for seed in seeds)
+    buckets: List[Optional[List[int]]] = [[]]
+    for seed in seeds:
+        while len(buckets) <= distance[seed] - base:
+            buckets.append([])
+        buckets[distance[seed] - base].append(seed)
+
+    current = 0
+    while current < len(buckets):
+        reached = current + base
+        for tile in buckets[current]:
+            if distance[tile] != reached:
+                continue #reached more cheaply since it was queued
+            for neighbor in neighbors[tile]:
+                if not open_tiles[neighbor]:
+                    continue
+                cost = reached + (movement_cost[tile] if toward_source else movement_cost[neighbor])
+                old = distance[neighbor]
+                if old == UNREACHABLE or cost < old:
+                    distance[neighbor] = cost
+                    parent[neighbor] = tile
+                    while len(buckets) <= cost - base:
+                        buckets.append([])
+                    buckets[cost - base].append(neighbor)
+        buckets[current] = None
+        current += 1
+
+
+class DistanceField:
+    '''
+    Cheapest movement cost from one source tile to every tile, with the previous tile of each cheapest path
+    Fields searched toward the source hold the cost from every tile to the source, and the next tile on the way there
+    Tiles are numbered x * height + y; unreachable tiles have distance UNREACHABLE
+    '''
+
+    def __init__(self, height: int, source: int, distance: List[int], parent: List[int]):
+        self.height = height
+        self.source = source
+        self.distance = distance
+        self.parent = parent
+
+    def distance_to(self, x: int, y: int) -> Optional[int]:
+        distance = self.distance[x * self.height + y]
+        return distance if distance != UNREACHABLE else None
+
+    def path_to(self, x: int, y: int) -> Optional[List[Tuple[int, int]]]:
+        '''Tiles stepped on from the source to (x, y), (x, y) included and the source not; None if unreachable'''
+        index = x * self.height + y
+        if self.distance[index] == UNREACHABLE:
+            return None
+
+        path = []
+        while index != self.source:
+            path.append(divmod(index, self.height))
+            index = self.parent[index]
+        path.reverse()
+        return path
+
+    def path_from(self, x: int, y: int) -> Optional[List[Tuple[int, int]]]:
+        '''For fields searched toward the source: tiles stepped on from (x, y) to the source, the source included'''
+        index = x * self.height + y
+        if self.distance[index] == UNREACHABLE:
+            return None
+
+        path = []
+        while index != self.source:
+            index = self.parent[index]
+            path.append(divmod(index, self.height))
+        return path
+
+
+class Pathfinder:
+    '''
+    Dijkstra over the game's rule tables, one distance field per (walk class, source tile, blocked by units)
+
+    Entering a tile costs its Tile.movement_cost, the same as RobotController.move_unit_in_direction, and units
+    move like a king. Paths are rebuilt from parent links instead of being copied per node.
+
+    Fields are cached and shared by both teams; the cache is dropped when a bridge is built (Map.version) or a
+    unit is placed, moved or removed (GameState.occupancy_version). Flow fields toward a target ignore units, so
+    they are only dropped when a bridge is built, and at most FLOW_FIELD_CACHE_SIZE of them are kept.
+    '''
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.width = game_state.map.width
+        self.height = game_state.map.height
+
+        self.neighbors = neighbor_table(self.width, self.height)
+
+        self.fields: Dict[Tuple[FrozenSet[Tile], int, bool], DistanceField] = {}
+        self.flow_fields: 'OrderedDict[Tuple[FrozenSet[Tile], int], DistanceField]' = OrderedDict()
+        self.version: Tuple[int, int] = (-1, -1)
+
+        #flattened rule tables and occupancy, rebuilt when their version changes
+        self.open_tiles: Dict[FrozenSet[Tile], List[bool]] = {}
+        self.movement_cost: List[int] = []
+        self.occupied: List[bool] = []
+
+    def refresh(self):
+        '''Drops everything cached if the map or the unit positions changed since it was computed'''
+        version = (self.game_state.map.version, self.game_state.occupancy_version)
+        if version == self.version:
+            return
+
+        if version[0] != self.version[0]:
+            self.open_tiles = {}
+            self.flow_fields = OrderedDict()
+            self.movement_cost = [cost for column in self.game_state.rules.movement_cost for cost in column]
+        self.occupied = [not free for column in self.game_state.unit_placeable_map for free in column]
+        self.fields = {}
+        self.version = version
+
+    def field(self, walk_class: FrozenSet[Tile], x: int, y: int, avoid_units: bool = True) -> DistanceField:
+        '''Distance field from (x, y) for units of walk_class; with avoid_units, tiles holding a unit cannot be entered'''
+        self.refresh()
+
+        source = x * self.height + y
+        key = (walk_class, source, avoid_units)
+        field = self.fields.get(key)
+        if field is None:
+            field = self.compute(walk_class, source, avoid_units)
+            self.fields[key] = field
+        return field
+
+    def flow_field(self, walk_class: FrozenSet[Tile], x: int, y: int) -> DistanceField:
+        '''Field searched toward (x, y) for units of walk_class, ignoring units: from any tile, step to a neighbor with less distance'''
+        self.refresh()
+
+        target = x * self.height + y
+        key = (walk_class, target)
+        field = self.flow_fields.get(key)
+        if field is not None:
+            self.flow_fields.move_to_end(key)
+        else:
+            distance = [UNREACHABLE] * (self.width * self.height)
+            parent = [UNREACHABLE] * (self.width * self.height)
+            distance[target] = 0
+            propagate(distance, parent, [target], self.walkable(walk_class), self.movement_cost, self.neighbors, toward_source=True)
+            field = DistanceField(self.height, target, distance, parent)
+            self.flow_fields[key] = field
+            if len(self.flow_fields) > FLOW_FIELD_CACHE_SIZE:
+                self.flow_fields.popitem(last=False)
+        return field
+
+    def walkable(self, walk_class: FrozenSet[Tile]) -> List[bool]:
+        open_tiles = self.open_tiles.get(walk_class)
+        if open_tiles is None:
+            open_tiles = [passable for column in self.game_state.rules.passable[walk_class] for passable in column]
+            self.open_tiles[walk_class] = open_tiles
+        return open_tiles
+
+    def compute(self, walk_class: FrozenSet[Tile], source: int, avoid_units: bool) -> DistanceField:
+        open_tiles = self.walkable(walk_class)
+        if avoid_units:
+            open_tiles = [passable and not occupied for passable, occupied in zip(open_tiles, self.occupied)]
+
+        distance = [UNREACHABLE] * (self.width * self.height)
+        parent = [UNREACHABLE] * (self.width * self.height)
+        distance[source] = 0
+        propagate(distance, parent, [source], open_tiles, self.movement_cost, self.neighbors, toward_source=False)
+
+        return DistanceField(self.height, source, distance, parent)
+
+
+class CastleDistances:
+    '''
+    Walking distance from every tile to each main castle, for every walk class of UnitType, computed at game start
+    A castle's own tile always counts as walkable, so units that cannot stand on it still get distances to its side
+
+    Kept up to date by set_tile: a tile that becomes walkable for a class (a bridge for land units) only shortens
+    walks, so its distance is taken from its neighbors and the improvement spreads from there; any other change
+    recomputes the fields of the affected walk class
+    '''
+
+    def __init__(self, map, rules):
+        self.width = map.width
+        self.height = map.height
+        self.neighbors = neighbor_table(self.width, self.height)
+
+        self.movement_cost = [cost for column in rules.movement_cost for cost in column]
+        self.open_tiles: Dict[FrozenSet[Tile], List[bool]] = {}
+
+        self.castles = {team: x * self.height + y for team, (x, y) in map.castle_locs.items()}
+        self.fields: Dict[Tuple[Team, FrozenSet[Tile]], DistanceField] = {}
+
+        for unit_type in UnitType:
+            walk_class = unit_type.walk_class
+            if walk_class not in self.open_tiles:
+                self.open_tiles[walk_class] = [passable for column in rules.passable[walk_class] for passable in column]
+                self.compute(walk_class)
+
+    def compute(self, walk_class: FrozenSet[Tile]):
+        for team, castle in self.castles.items():
+            distance = [UNREACHABLE] * (self.width * self.height)
+            parent = [UNREACHABLE] * (self.width * self.height)
+            distance[castle] = 0
+            propagate(distance, parent, [castle], self.open_tiles[walk_class], self.movement_cost, self.neighbors, toward_source=True)
+            self.fields[(team, walk_class)] = DistanceField(self.height, castle, distance, parent)
+
+    def field(self, team: Team, walk_class: FrozenSet[Tile]) -> DistanceField:
+        return self.fields[(team, walk_class)]
+
+    def set_tile(self, rules, x: int, y: int):
+        '''Updates the fields after the tile at (x, y) changed; rules must already hold the new tile'''
+        index = x * self.height + y
+        cost_changed = self.movement_cost[index] != rules.movement_cost[x][y]
+        self.movement_cost[index] = rules.movement_cost[x][y]
+
+        for walk_class, open_tiles in self.open_tiles.items():
+            was_open, now_open = open_tiles[index], rules.passable[walk_class][x][y]
+            open_tiles[index] = now_open
+            if was_open == now_open and (not cost_changed or not now_open):
+                continue
+
+            if cost_changed or was_open:
+                self.compute(walk_class)
+                continue
+
+            #newly walkable: step onto the best neighbor, then let the shorter walks spread
+            for team in self.castles:
+                field = self.fields[(team, walk_class)]
+                distance, parent = field.distance, field.parent
+                for neighbor in self.neighbors[index]:
+                    if distance[neighbor] == UNREACHABLE:
+                        continue
+                    cost = distance[neighbor] + self.movement_cost[neighbor]
+                    if distance[index] == UNREACHABLE or cost < distance[index]:
+                        distance[index] = cost
+                        parent[index] = neighbor
+                if distance[index] != UNREACHABLE:
+                    propagate(distance, parent, [index], open_tiles, self.movement_cost, self.neighbors, toward_source=True)
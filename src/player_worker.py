@@ -0,0 +1,343 @@
+''' runs player code on a long-lived worker, either a thread in the engine process or an isolated subprocess '''
+
+import os
+import sys
+import time
+import signal
+import traceback
+import importlib.util
+import multiprocessing
+from threading import Thread, Event
+from typing import Tuple, List
+
+from src.player import Player
+from src.robot_controller import RobotController
+from src.game_state import GameState
+from src.game_constants import Team
+from src.units import Unit
+from src.buildings import Building
+from src.map import Map
+from src.diagnostics import Diagnostics, Level
+
+
+# an isolated bot that stops answering is killed after this much wall time (a bot sleeping uses no cpu)
+WALL_TIME_FACTOR = 2
+WALL_TIME_GRACE = 0.5
+
+# how long stop() waits for a worker thread to finish; a bot still stuck in a timed-out turn is left to finish on its own
+STOP_JOIN_TIMEOUT = 1.0
+
+# RobotController methods that change the game state; these are recorded by isolated bots and replayed by the engine
+MUTATING_METHODS = [
+    "spawn_unit", "build_building",
+    "sell_unit", "sell_building", "disband_unit", "destroy_building",
+    "unit_attack_location", "unit_attack_unit", "unit_attack_building",
+    "building_attack_location", "building_attack_unit",
+    "move_unit_in_direction", "move_units_toward",
+    "explore_for_gold", "explore_for_health", "explore_for_attack", "explore_for_defense",
+    "build_bridge", "heal_unit", "harm_farm",
+    "perform_actions",
+]
+
+
+class PlayerWorker:
+    '''
+    Owns one daemon thread per player that waits for "play turn" requests and signals when the turn is done
+
+    A turn that does not finish within its time budget leaves the worker busy; it is never asked to play again.
+    stop() ends the thread (once any timed-out turn returns) and drops the player and controller, so a process
+    playing many games does not keep every finished game alive
+    '''
+
+    def __init__(self, player: Player, controller: RobotController, name: str):
+        self.player = player
+        self.controller = controller
+
+        self.requested = Event() # set by the engine to start a turn
+        self.finished = Event() # set by the worker once play_turn returns
+        self.stopping = Event() # set by stop(); the thread exits instead of playing
+
+        self.busy = False # True while a timed-out turn may still be running
+
+        self.thread = Thread(target=self.loop, name=name, daemon=True)
+        self.thread.start()
+
+    def loop(self):
+        '''Worker thread body: plays one turn per request until stopped'''
+
+        while True:
+            self.requested.wait()
+            self.requested.clear()
+            if self.stopping.is_set():
+                return
+
+            try:
+                self.player.play_turn(self.controller)
+            except Exception:
+                #errors in player code do not end the game, same as an uncaught error in a thread
+                traceback.print_exc()
+            finally:
+                self.finished.set()
+
+    def play_turn(self, timeout: float) -> Tuple[bool, float]:
+        '''
+        Runs one turn of player code, waiting at most timeout seconds
+
+        Returns (finished in time, wall time spent)
+        '''
+
+        if self.busy:
+            return False, 0.0
+
+        self.finished.clear()
+
+        start = time.time()
+        self.requested.set()
+        done = self.finished.wait(max(timeout, 0))
+        elapsed = time.time() - start
+
+        if not done:
+            self.busy = True
+
+        return done, elapsed
+
+    def stop(self):
+        '''Ends the worker thread and releases the player and the controller (and with it the game state)'''
+        self.stopping.set()
+        self.requested.set()
+        self.thread.join(STOP_JOIN_TIMEOUT)
+
+        self.player = None
+        self.controller = None
+
+
+
+'''
+-------------------------------
+Process-isolated bot execution
+-------------------------------
+'''
+
+
+class RecordingRobotController(RobotController):
+    '''
+    RobotController used inside an isolated bot process
+
+    Actions are applied to the process's own copy of the game state so the bot sees their effects,
+    and the top-level calls are recorded so the engine can replay them on the real game state
+
+    Messages raised by recorded calls are left out of the process's diagnostics, since the engine reports them
+    again when it replays the call
+    '''
+
+    def __init__(self, team: Team, game_state: GameState):
+        super().__init__(team, game_state)
+        self.game_state = game_state
+        self.diagnostics = game_state.diagnostics
+        self.actions: List[Tuple[str, tuple, dict]] = []
+        self.depth = 0 # nested calls (unit_attack_unit -> unit_attack_location) are only recorded once
+
+
+def record_action(name: str):
+    '''Wraps a RobotController method so that top-level calls are recorded'''
+
+    method = getattr(RobotController, name)
+
+    def recorded(self: RecordingRobotController, *args, **kwargs):
+        if self.depth > 0:
+            return method(self, *args, **kwargs)
+
+        self.actions.append((name, args, kwargs))
+        self.depth += 1
+        self.game_state.diagnostics = Diagnostics()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.depth -= 1
+            self.game_state.diagnostics = self.diagnostics
+
+    recorded.__name__ = name
+    recorded.__doc__ = method.__doc__
+    return recorded
+
+
+for method_name in MUTATING_METHODS:
+    setattr(RecordingRobotController, method_name, record_action(method_name))
+
+
+
+def run_player_process(conn, bot_path: str, module_name: str, team: Team, map: Map, diagnostics_level: Level, diagnostics_limit: int):
+    '''
+    Body of an isolated bot process
+
+    Imports and initializes the bot, then for every turn request rebuilds the game state sent by the engine,
+    plays the turn under a cpu time limit and sends back the recorded actions, the cpu time used and the
+    messages counted during the turn. One Diagnostics is kept for the whole game, so messages are rate limited
+    across turns like in the engine
+
+    The static tables of the map (GameState.STATIC_TABLES) are only sent when the map changed, and kept between turns.
+    Bridges the bot builds change them in place, so they are dropped and the engine asked to send them again
+    '''
+
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, bot_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[module_name] = module
+        player = module.BotPlayer(map)
+    except Exception as e:
+        print(f"Error initializing {team.name.lower()} bot: {e}")
+        traceback.print_exc()
+        conn.send(("ready", False, False))
+        return
+
+    conn.send(("ready", True, hasattr(player, "play_turn")))
+
+    def out_of_time(signum, frame):
+        print(f"{team.name} bot exceeded its cpu time budget")
+        sys.stdout.flush()
+        os._exit(1)
+
+    #cpu timer only exists on unix; elsewhere the engine's wall time limit applies
+    cpu_timer = hasattr(signal, "setitimer")
+    if cpu_timer:
+        signal.signal(signal.SIGPROF, out_of_time)
+
+    static_tables = None
+    diagnostics = Diagnostics(diagnostics_level, diagnostics_limit)
+    sent_counts = {} # counts already sent to the engine
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+
+        if message[0] == "stop":
+            return
+
+        _, snapshot, new_static_tables, unit_id_counter, building_id_counter, budget = message
+        if new_static_tables is not None:
+            static_tables = new_static_tables
+
+        #ids of objects created this turn must match the ones the engine will create on replay
+        Unit.id_counter = unit_id_counter
+        Building.id_counter = building_id_counter
+
+        game_state = GameState.from_snapshot(snapshot, static_tables, diagnostics)
+        map_version = game_state.map.version
+        controller = RecordingRobotController(team, game_state)
+
+        if cpu_timer:
+            signal.setitimer(signal.ITIMER_PROF, max(budget, 1e-6))
+        start = time.process_time()
+
+        try:
+            player.play_turn(controller)
+        except Exception:
+            traceback.print_exc()
+
+        cpu_time = time.process_time() - start
+        if cpu_timer:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+
+        tables_changed = game_state.map.version != map_version
+        if tables_changed:
+            static_tables = None
+
+        #bot and engine messages reach the console turn by turn, not when the process exits
+        sys.stdout.flush()
+
+        new_counts = {
+            message: count - sent_counts.get(message, 0)
+            for message, count in diagnostics.counts.items() if count != sent_counts.get(message, 0)
+        }
+        sent_counts = dict(diagnostics.counts)
+
+        conn.send(("done", controller.actions, cpu_time, tables_changed, new_counts))
+
+
+class ProcessPlayerWorker:
+    '''
+    Runs a bot in its own subprocess, talking to the engine over a pipe
+
+    The bot is charged the cpu time its process used for the turn, and the process is killed outright
+    if it runs out of cpu time or stops answering. Its actions only reach the real game state when the
+    engine replays them, so a killed bot can never change the game afterwards.
+    '''
+
+    def __init__(self, bot_path: str, module_name: str, team: Team, map: Map, game_state: GameState, controller: RobotController, name: str):
+        self.game_state = game_state
+        self.controller = controller # the engine's controller that recorded actions are replayed on
+
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=run_player_process, name=name, daemon=True,
+            args=(child_conn, bot_path, module_name, team, map, game_state.diagnostics.level, game_state.diagnostics.limit)
+        )
+        self.process.start()
+        child_conn.close()
+
+        try:
+            _, self.ready, self.has_play_turn = self.conn.recv()
+        except EOFError:
+            self.ready, self.has_play_turn = False, False
+
+        self.busy = False
+        self.tables_version = None # map version of the static tables the process holds, None if it holds none
+
+    def play_turn(self, timeout: float) -> Tuple[bool, float]:
+        '''
+        Runs one turn of player code with a cpu time budget of timeout seconds
+
+        Returns (finished in time, cpu time spent)
+        '''
+
+        if self.busy:
+            return False, 0.0
+
+        static_tables = None
+        if self.game_state.map.version != self.tables_version:
+            static_tables = self.game_state.static_tables()
+            self.tables_version = self.game_state.map.version
+
+        self.conn.send(("turn", self.game_state.snapshot(), static_tables, Unit.id_counter, Building.id_counter, max(timeout, 0)))
+
+        try:
+            if not self.conn.poll(max(timeout, 0) * WALL_TIME_FACTOR + WALL_TIME_GRACE):
+                raise EOFError
+            _, actions, cpu_time, tables_changed, new_counts = self.conn.recv()
+        except (EOFError, OSError):
+            #out of cpu time (the process exited itself) or not answering
+            self.busy = True
+            self.stop()
+            return False, timeout
+
+        if tables_changed:
+            self.tables_version = None
+        self.game_state.diagnostics.merge(new_counts)
+
+        for name, args, kwargs in actions:
+            getattr(self.controller, name)(*args, **kwargs)
+
+        return True, cpu_time
+
+    def stop(self):
+        '''Shuts down the bot process, killing it if it does not exit on its own'''
+
+        if self.process.is_alive():
+            try:
+                self.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+
+            self.process.join(0.1)
+
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+
+        self.conn.close()
+        self.game_state = None
+        self.controller = None
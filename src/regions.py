@@ -0,0 +1,104 @@
+''' connected regions of the map per unit walk class, so bots can ask whether a walk between two tiles exists '''
+
+from typing import List, Dict, FrozenSet
+
+from src.game_constants import Tile, UnitType
+from src.pathfinding import neighbor_table
+
+
+NO_REGION = -1
+
+
+class Regions:
+    '''
+    Labels the tiles of each walk class of UnitType with the connected region they belong to (king moves)
+    Unwalkable tiles have label NO_REGION
+
+    Labels are computed once at game start and kept up to date by set_tile: a tile that becomes walkable joins the
+    regions of its neighbors, the smaller regions being relabeled into the largest, so labels can be compared and
+    sizes read directly; a tile that stops being walkable can split a region, so its walk class is relabeled
+    '''
+
+    def __init__(self, map, rules):
+        self.width = map.width
+        self.height = map.height
+        self.neighbors = neighbor_table(self.width, self.height)
+
+        self.labels: Dict[FrozenSet[Tile], List[int]] = {}
+        self.members: Dict[FrozenSet[Tile], Dict[int, List[int]]] = {} # label -> tiles of that region
+        self.next_label = 0
+
+        for unit_type in UnitType:
+            if unit_type.walk_class not in self.labels:
+                self.label(unit_type.walk_class, rules)
+
+    def label(self, walk_class: FrozenSet[Tile], rules):
+        '''Labels every region of a walk class from scratch'''
+        passable = rules.passable[walk_class]
+        labels = [NO_REGION] * (self.width * self.height)
+        members = {}
+
+        for start in range(self.width * self.height):
+            if labels[start] != NO_REGION or not passable[start // self.height][start % self.height]:
+                continue
+
+            region = self.next_label
+            self.next_label += 1
+            labels[start] = region
+            tiles = [start]
+            #tiles doubles as the queue of the flood fill: everything before expanded has had its neighbors added
+            expanded = 0
+            while expanded < len(tiles):
+                for neighbor in self.neighbors[tiles[expanded]]:
+                    if labels[neighbor] == NO_REGION and passable[neighbor // self.height][neighbor % self.height]:
+                        labels[neighbor] = region
+                        tiles.append(neighbor)
+                expanded += 1
+            members[region] = tiles
+
+        self.labels[walk_class] = labels
+        self.members[walk_class] = members
+
+    def region(self, walk_class: FrozenSet[Tile], x: int, y: int) -> int:
+        return self.labels[walk_class][x * self.height + y]
+
+    def same_region(self, walk_class: FrozenSet[Tile], x1: int, y1: int, x2: int, y2: int) -> bool:
+        labels = self.labels[walk_class]
+        region = labels[x1 * self.height + y1]
+        return region != NO_REGION and region == labels[x2 * self.height + y2]
+
+    def region_size(self, walk_class: FrozenSet[Tile], x: int, y: int) -> int:
+        region = self.labels[walk_class][x * self.height + y]
+        if region == NO_REGION:
+            return 0
+        return len(self.members[walk_class][region])
+
+    def set_tile(self, rules, x: int, y: int):
+        '''Updates the labels after the tile at (x, y) changed; rules must already hold the new tile'''
+        index = x * self.height + y
+
+        for walk_class, labels in self.labels.items():
+            was_open, now_open = labels[index] != NO_REGION, rules.passable[walk_class][x][y]
+            if was_open == now_open:
+                continue
+
+            if was_open:
+                self.label(walk_class, rules)
+                continue
+
+            members = self.members[walk_class]
+            joined = {labels[neighbor] for neighbor in self.neighbors[index]} - {NO_REGION}
+            if not joined:
+                region = self.next_label
+                self.next_label += 1
+                members[region] = []
+            else:
+                #keep the label of the largest region (lowest label on ties) and move the others into it
+                region = min(joined, key=lambda label: (-len(members[label]), label))
+                for other in sorted(joined - {region}):
+                    for tile in members[other]:
+                        labels[tile] = region
+                    members[region].extend(members.pop(other))
+
+            labels[index] = region
+            members[region].append(index)
@@ -0,0 +1,672 @@
+''' records the turn-by-turn replay of a game, as full snapshots or as keyframes plus per-turn deltas '''
+
+import copy
+import json
+import bisect
+import textwrap
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator
+
+from src.replay_binary import is_binary_replay, decode_replay
+
+
+'''
+--------------
+Delta encoding
+--------------
+'''
+
+# game_state entries that hold per-team lists of objects keyed by id; everything else is diffed as a whole value
+OBJECT_KEYS = ["units", "buildings"]
+
+
+def diff_objects(previous: List[Dict], current: List[Dict]) -> Optional[Dict]:
+    '''
+    Diffs one team's list of unit or building dicts between two turns
+
+    Returns {"spawned": [new dicts], "removed": [ids], "changed": [[id, {field: value}]]} with empty parts left out,
+    an empty dict if nothing changed, or None if the order of the list cannot be rebuilt from a delta
+    '''
+
+    previous_by_id = {obj["id"]: obj for obj in previous}
+    current_ids = set()
+
+    changed = []
+    spawned = []
+    surviving_order = []
+
+    for obj in current:
+        obj_id = obj["id"]
+        current_ids.add(obj_id)
+
+        old = previous_by_id.get(obj_id)
+        if old is None:
+            spawned.append(obj)
+            continue
+
+        #objects that already existed must come before new ones, in their old order
+        if spawned:
+            return None
+        surviving_order.append(obj_id)
+
+        fields = {key: value for key, value in obj.items() if old.get(key) != value}
+        if fields:
+            changed.append([obj_id, fields])
+
+    removed = [obj["id"] for obj in previous if obj["id"] not in current_ids]
+
+    if [obj["id"] for obj in previous if obj["id"] in current_ids] != surviving_order:
+        return None
+
+    delta = {}
+    if spawned:
+        delta["spawned"] = spawned
+    if removed:
+        delta["removed"] = removed
+    if changed:
+        delta["changed"] = changed
+    return delta
+
+
+def apply_objects(previous: List[Dict], delta: Dict) -> List[Dict]:
+    '''Rebuilds one team's list of unit or building dicts from the previous turn's list and its delta'''
+
+    removed = set(delta.get("removed", []))
+    changed = dict((obj_id, fields) for obj_id, fields in delta.get("changed", []))
+
+    current = []
+    for obj in previous:
+        if obj["id"] in removed:
+            continue
+
+        fields = changed.get(obj["id"])
+        if fields:
+            obj = dict(obj)
+            obj.update(fields)
+
+        current.append(obj)
+
+    current.extend(copy.deepcopy(delta.get("spawned", [])))
+    return current
+
+
+def diff_game_state(previous: Dict, current: Dict) -> Optional[Dict]:
+    '''
+    Computes the delta between two consecutive game_state dicts (as produced by GameState.to_dict)
+    Returns None if the current state has to be stored as a keyframe instead
+    '''
+
+    if previous.keys() != current.keys():
+        return None
+
+    delta = {}
+
+    for key, value in current.items():
+        if key in OBJECT_KEYS:
+            if previous[key].keys() != value.keys():
+                return None
+
+            team_deltas = {}
+            for team, objects in value.items():
+                team_delta = diff_objects(previous[key][team], objects)
+                if team_delta is None:
+                    return None
+                if team_delta:
+                    team_deltas[team] = team_delta
+
+            if team_deltas:
+                delta[key] = team_deltas
+
+        elif previous[key] != value:
+            delta[key] = copy.deepcopy(value)
+
+    return delta
+
+
+def apply_game_state(previous: Dict, delta: Dict) -> Dict:
+    '''Rebuilds a full game_state dict from the previous turn's game_state and its delta'''
+
+    current = {}
+
+    for key, value in previous.items():
+        if key in OBJECT_KEYS:
+            team_deltas = delta.get(key, {})
+            current[key] = {
+                team: apply_objects(objects, team_deltas[team]) if team in team_deltas else list(objects)
+                for team, objects in value.items()
+            }
+        elif key in delta:
+            current[key] = copy.deepcopy(delta[key])
+        else:
+            current[key] = value
+
+    return current
+
+
+
+'''
+---------
+Recorders
+---------
+'''
+
+
+class ReplayRecorder:
+    '''
+    Stores the full game state of every turn in memory
+    This is the original replay layout read by replay_game_cli.py
+    '''
+
+    replay_format = "full"
+
+    def __init__(self):
+        self.records: List[Dict] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def record(self, turn_data: Dict):
+        '''Records one turn of {"turn_number": ..., "game_state": ...}'''
+        self.records.append(turn_data)
+
+    def pop(self):
+        '''Drops the last recorded turn'''
+        if self.records:
+            self.records.pop()
+
+    def flush(self):
+        '''Encodes turns held back; full replays keep the recorded dicts as they are, so there are none'''
+
+    def export_data(self) -> Dict:
+        '''The replay entries to merge into the exported replay file'''
+        return {"replay": self.records}
+
+
+class DeltaReplayRecorder(ReplayRecorder):
+    '''
+    Stores a keyframe with the full game state, then only what changed each turn:
+    spawned and removed units/buildings, changed fields (position, health, ...) and changed balances
+
+    Turns that cannot be expressed as a delta are stored as keyframes, as is every keyframe_interval-th turn if set
+    so readers can start from a nearby turn. Use expand_replay to get the full layout back
+
+    The last turn recorded is only encoded once the next one arrives (or on export), as GameState.to_dict may still
+    zero the health of its buildings in place when the game ends; a full replay shows that change, so a delta must too
+    '''
+
+    replay_format = "delta"
+
+    def __init__(self, keyframe_interval: Optional[int] = None):
+        super().__init__()
+        self.keyframe_interval = keyframe_interval
+        self.recorded = 0 # turns encoded so far, including ones already handed off by a streaming recorder
+        self.previous_states: List[Optional[Dict]] = [None] # game_state before each encoded turn, for pop
+        self.pending: Optional[Dict] = None # last turn recorded, not encoded yet
+
+    def __len__(self) -> int:
+        return len(self.records) + (self.pending is not None)
+
+    def record(self, turn_data: Dict):
+        self.flush()
+        self.pending = turn_data
+
+    def flush(self):
+        if self.pending is None:
+            return
+        turn_data = self.pending
+        self.pending = None
+
+        game_state = turn_data.get("game_state")
+        previous = self.previous_states[-1]
+
+        self.recorded += 1
+
+        if game_state is None:
+            #placeholder turns (bot failed to initialize) are kept as is
+            self.records.append(turn_data)
+            self.previous_states.append(previous)
+            return
+
+        if previous is None or (self.keyframe_interval and (self.recorded - 1) % self.keyframe_interval == 0):
+            delta = None
+        else:
+            delta = diff_game_state(previous, game_state)
+
+        if delta is None:
+            self.records.append(turn_data)
+        else:
+            entry = {key: value for key, value in turn_data.items() if key != "game_state"}
+            entry["delta"] = delta
+            self.records.append(entry)
+
+        self.previous_states.append(game_state)
+
+        #only the latest state is needed to diff and to undo one pop
+        if len(self.previous_states) > 2:
+            del self.previous_states[0]
+
+    def pop(self):
+        if self.pending is not None:
+            self.pending = None
+        elif self.records:
+            self.records.pop()
+            self.previous_states.pop()
+            self.recorded -= 1
+
+    def export_data(self) -> Dict:
+        self.flush()
+        return {"replay_format": self.replay_format, "replay": self.records}
+
+
+class StreamingReplayRecorder:
+    '''
+    Writes the replay to disk as turns complete instead of keeping it in memory
+
+    The stream is JSON lines: a header record, then one record per turn (full or delta, as encoded by the
+    wrapped recorder) and per map change, then an end record with the winner. The last turn is held back
+    until the next one arrives, so it can still be popped and changed in place (see DeltaReplayRecorder).
+
+    A finished stream also ends with an index record (byte offset of every turn and which turns are keyframes)
+    and a fixed-width footer pointing at it, so SeekableReplay can jump straight to any turn.
+    '''
+
+    def __init__(self, path: str, header: Dict, recorder: ReplayRecorder):
+        self.path = path
+        self.recorder = recorder # encodes turns as they are written
+        self.replay_format = recorder.replay_format
+        self.written = 0
+        self.pending: Optional[Dict] = None # last turn recorded, not written yet
+
+        #the index: byte offset of each turn record, positions of the turns stored as full states
+        self.offset = 0
+        self.turn_offsets: List[int] = []
+        self.keyframes: List[int] = []
+
+        self.file = open(path, 'wb')
+        self.write({"type": "header", "replay_format": self.replay_format, **header})
+
+    def __len__(self) -> int:
+        return self.written + (self.pending is not None)
+
+    def write(self, record: Dict):
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode("utf-8")
+        self.file.write(line)
+        self.file.flush()
+        self.offset += len(line)
+
+    def write_pending(self):
+        '''Encodes and writes the turn that was held back'''
+        if self.pending is None:
+            return
+        self.recorder.record(self.pending)
+        self.recorder.flush()
+        self.pending = None
+
+        for entry in self.recorder.records:
+            if "delta" not in entry:
+                self.keyframes.append(self.written)
+            self.turn_offsets.append(self.offset)
+
+            self.write({"type": "turn", **entry})
+            self.written += 1
+        self.recorder.records.clear()
+
+    def record(self, turn_data: Dict):
+        self.write_pending()
+        self.pending = turn_data
+
+    def record_map_change(self, turn: int, tiles: List[List[str]]):
+        '''Records the whole map after it changed on a turn (a bridge was built)'''
+        self.write({"type": "map_change", "turn": turn, "tiles": tiles})
+
+    def pop(self):
+        self.pending = None
+
+    def finish(self, trailer: Dict):
+        '''Writes the remaining turn, the end record and the index, and closes the stream'''
+        self.write_pending()
+
+        end_offset = self.offset
+        self.write({"type": "end", **trailer})
+
+        index_offset = self.offset
+        self.write({"type": "index", "turns": self.turn_offsets, "keyframes": self.keyframes, "end": end_offset})
+        self.write(stream_footer(index_offset))
+        self.file.close()
+
+
+def make_recorder(replay_format: str, keyframe_interval: Optional[int] = None) -> ReplayRecorder:
+    '''Returns the recorder for a replay format name ("full" or "delta")'''
+
+    if replay_format == "full":
+        return ReplayRecorder()
+    if replay_format == "delta":
+        return DeltaReplayRecorder(keyframe_interval)
+
+    raise ValueError(f"Unknown replay format {replay_format}")
+
+
+
+'''
+-------
+Readers
+-------
+'''
+
+
+class ReplayReader:
+    '''Reconstructs the full game state of any turn of a loaded replay, whatever its format'''
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.records: List[Dict] = data["replay"]
+
+        #cache of the last turn rebuilt, so stepping forward one turn only applies one delta
+        self.cached: Optional[Tuple[int, Dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def turn(self, index: int) -> Dict:
+        '''Returns the record of the turn at index in the original {"turn_number", "game_state"} layout'''
+
+        record = self.records[index]
+        if "delta" not in record:
+            return record
+
+        entry = {key: value for key, value in record.items() if key != "delta"}
+        entry["game_state"] = self.game_state(index)
+        return entry
+
+    def game_state(self, index: int) -> Optional[Dict]:
+        '''Returns the full game_state dict of the turn at index'''
+
+        if "delta" not in self.records[index]:
+            return self.records[index].get("game_state")
+
+        #walk back to the nearest keyframe (or the cached turn) and apply deltas forward
+        start = index
+        while "delta" in self.records[start]:
+            if self.cached is not None and self.cached[0] == start:
+                break
+            start -= 1
+
+        if self.cached is not None and self.cached[0] == start:
+            state = self.cached[1]
+        else:
+            state = self.records[start]["game_state"]
+
+        for i in range(start + 1, index + 1):
+            record = self.records[i]
+            state = apply_game_state(state, record["delta"]) if "delta" in record else record.get("game_state", state)
+
+        self.cached = (index, state)
+        return state
+
+
+def expand_records(records: Iterable[Dict]) -> Iterator[Dict]:
+    '''Turns a sequence of full or delta turn records into full turn records, holding only one game state at a time'''
+
+    state = None
+    for record in records:
+        if "delta" in record:
+            state = apply_game_state(state, record["delta"])
+            entry = {key: value for key, value in record.items() if key != "delta"}
+            entry["game_state"] = state
+            yield entry
+        else:
+            state = record.get("game_state", state)
+            yield record
+
+
+def expand_replay(data: Dict) -> Dict:
+    '''Converts a loaded replay of any format into the original layout with a full game state every turn'''
+
+    if data.get("replay_format", "full") == "full":
+        return data
+
+    expanded = {key: value for key, value in data.items() if key != "replay_format"}
+    expanded["replay"] = list(expand_records(data["replay"]))
+    return expanded
+
+
+def load_replay(path: str) -> Dict:
+    '''Loads a JSON (full or delta) or binary replay file into the original layout'''
+
+    with open(path, 'rb') as f:
+        blob = f.read()
+
+    if is_binary_replay(blob):
+        return decode_replay(blob)
+
+    return expand_replay(json.loads(blob))
+
+
+
+'''
+--------------
+Replay streams
+--------------
+'''
+
+
+# delta streams store a full state this often, so seeking applies at most this many deltas
+STREAM_KEYFRAME_INTERVAL = 100
+
+
+def stream_footer(index_offset: int) -> Dict:
+    '''The last record of a finished stream; always the same length so it can be read from the end of the file'''
+    return {"type": "footer", "index": f"{index_offset:020d}"}
+
+STREAM_FOOTER_SIZE = len(json.dumps(stream_footer(0), separators=(',', ':'))) + 1
+
+
+def read_stream(path: str) -> Iterator[Dict]:
+    '''Yields the records of a replay stream; a stream cut short by a crash simply ends early'''
+
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                return #partially written last line
+
+
+def stream_turns(path: str) -> Iterator[Dict]:
+    '''Yields the turn records of a replay stream without their record type'''
+    for record in read_stream(path):
+        if record["type"] == "turn":
+            yield {key: value for key, value in record.items() if key != "type"}
+
+
+def convert_stream(stream_path: str, output_path: str):
+    '''
+    Writes the original .awap25r JSON layout (full game state every turn) from a replay stream
+    Turns are converted one at a time, so memory use does not grow with the length of the game
+    '''
+
+    header: Dict = {}
+    changed_turns = []
+    changed_maps = []
+    winner_color = None
+
+    #first pass: everything except the turns, which come last in the replay file
+    for record in read_stream(stream_path):
+        if record["type"] == "header":
+            header = record
+        elif record["type"] == "map_change":
+            changed_turns.append(record["turn"])
+            changed_maps.append(record["tiles"])
+        elif record["type"] == "end":
+            winner_color = record.get("winner_color")
+
+    fields = {
+        "ID": header.get("ID"),
+        "map": header.get("map"),
+        "map-changes": {
+            "changed-turns": changed_turns,
+            "changed-maps": changed_maps
+        },
+        "winner_color": winner_color,
+    }
+
+    #same layout as json.dump(..., indent=4), written piece by piece
+    with open(output_path, 'w') as out:
+        out.write("{\n")
+        for key, value in fields.items():
+            #dumping {key: value} and stripping the braces gives the entry indented as inside the file's object
+            out.write(json.dumps({key: value}, indent=4)[2:-2] + ",\n")
+
+        out.write('    "replay": [')
+        count = 0
+        for turn in expand_records(stream_turns(stream_path)):
+            out.write(",\n" if count else "\n")
+            out.write(textwrap.indent(json.dumps(turn, indent=4), " " * 8))
+            count += 1
+        out.write("\n    ]\n}" if count else "]\n}")
+
+
+def convert_to_stream(data: Dict, stream_path: str):
+    '''
+    Writes a loaded replay of any format as an indexed delta stream, so SeekableReplay can open it at any turn
+    JSON and binary replays have no index, so they are read in full once, here, rather than every time they are opened
+    '''
+
+    stream = StreamingReplayRecorder(
+        stream_path, {"ID": data.get("ID"), "map": data["map"]}, DeltaReplayRecorder(STREAM_KEYFRAME_INTERVAL)
+    )
+    for turn in expand_records(data["replay"]):
+        stream.record(turn)
+
+    map_changes = data.get("map-changes", {})
+    for changed_turn, tiles in zip(map_changes.get("changed-turns", []), map_changes.get("changed-maps", [])):
+        stream.record_map_change(changed_turn, tiles)
+
+    stream.finish({"winner_color": data.get("winner_color")})
+
+
+class SeekableReplay:
+    '''
+    Random access to the turns of a replay stream without reading the whole file
+    Other replay files can be turned into a stream with convert_to_stream (convert_replay.py)
+
+    Uses the index at the end of a finished stream; a stream without one (the game crashed) is indexed with
+    a single scan of the file that does not parse the turns. A turn is rebuilt from the nearest keyframe at or
+    before it, and stepping forward one turn applies only that turn's delta.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+
+        self.header = self.read_line(0)
+
+        index = self.read_index()
+        if index is None:
+            index = self.scan_index()
+
+        self.turn_offsets: List[int] = index["turns"]
+        self.keyframes: List[int] = index["keyframes"]
+        self.end_offset: Optional[int] = index["end"]
+
+        self.cached: Optional[Tuple[int, Dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.turn_offsets)
+
+    def close(self):
+        self.file.close()
+
+    def read_line(self, offset: int) -> Dict:
+        self.file.seek(offset)
+        return json.loads(self.file.readline())
+
+    def read_index(self) -> Optional[Dict]:
+        '''Reads the index of a finished stream through its footer'''
+
+        self.file.seek(0, 2)
+        size = self.file.tell()
+        if size < STREAM_FOOTER_SIZE:
+            return None
+
+        self.file.seek(size - STREAM_FOOTER_SIZE)
+        try:
+            footer = json.loads(self.file.read())
+        except json.JSONDecodeError:
+            return None
+
+        if not isinstance(footer, dict) or footer.get("type") != "footer":
+            return None
+
+        return self.read_line(int(footer["index"]))
+
+    def scan_index(self) -> Dict:
+        '''Builds the index of an unfinished stream, looking only at the start of each line'''
+
+        turns = []
+        keyframes = []
+        end = None
+
+        self.file.seek(0)
+        offset = 0
+        for line in self.file:
+            if not line.endswith(b"\n"):
+                break #partially written last line
+
+            if line.startswith(b'{"type":"turn"'):
+                if b'"delta":' not in line:
+                    keyframes.append(len(turns))
+                turns.append(offset)
+            elif line.startswith(b'{"type":"end"'):
+                end = offset
+
+            offset += len(line)
+
+        return {"turns": turns, "keyframes": keyframes, "end": end}
+
+    @property
+    def map(self) -> Dict:
+        return self.header["map"]
+
+    @property
+    def winner_color(self) -> Optional[str]:
+        if self.end_offset is None:
+            return None
+        return self.read_line(self.end_offset).get("winner_color")
+
+    def record(self, index: int) -> Dict:
+        '''The turn record at index as stored (full or delta), without its record type'''
+        record = self.read_line(self.turn_offsets[index])
+        del record["type"]
+        return record
+
+    def game_state(self, index: int) -> Optional[Dict]:
+        '''Returns the full game_state dict of the turn at index'''
+
+        if self.cached is not None and self.cached[0] <= index:
+            start, state = self.cached
+        else:
+            start, state = -1, None
+
+        #jump to the last keyframe at or before the turn if it is past the cached turn
+        position = bisect.bisect_right(self.keyframes, index) - 1
+        if position >= 0 and self.keyframes[position] > start:
+            start = self.keyframes[position]
+            state = self.record(start).get("game_state")
+
+        for i in range(start + 1, index + 1):
+            record = self.record(i)
+            state = apply_game_state(state, record["delta"]) if "delta" in record else record.get("game_state", state)
+
+        self.cached = (index, state)
+        return state
+
+    def turn(self, index: int) -> Dict:
+        '''Returns the record of the turn at index in the original {"turn_number", "game_state"} layout'''
+
+        record = self.record(index)
+        if "delta" not in record:
+            return record
+
+        entry = {key: value for key, value in record.items() if key != "delta"}
+        entry["game_state"] = self.game_state(index)
+        return entry
@@ -0,0 +1,313 @@
+''' compact, versioned binary replay format and its conversion to and from the JSON replay layout '''
+
+import io
+import lzma
+import zlib
+import struct
+from array import array
+from typing import List, Dict, Optional
+
+
+'''
+Layout (all little-endian)
+
+    magic "AWAPRB", version (u8), compression (u8: 0 none, 1 zlib, 2 lzma), then the compressed body:
+
+    string table        u32 count, then (u16 length, utf-8 bytes) per string; strings are referenced by u16 index
+    ID, winner_color    string refs (0xFFFF is None)
+    map                 u16 width, u16 height, width * height tile string refs
+    map changes         u32 count, then (i32 turn, width * height tile string refs) per change
+    replay              u32 count, then per turn a u8 flag (0: empty placeholder, 1: turn) followed for turns by
+                        u32 turn_number, the scalar fields, and the buildings and units of each team as fixed-width records
+'''
+
+MAGIC = b"AWAPRB"
+VERSION = 1
+
+COMPRESSION = {"none": 0, "zlib": 1, "lzma": 2}
+
+NONE_REF = 0xFFFF
+
+UNIT_FIELDS = ["id", "team", "type", "x", "y", "turn_actions_remaining", "turn_movement_remaining",
+               "attack_range", "health", "damage", "defense", "damage_range", "level"]
+BUILDING_FIELDS = ["id", "team", "type", "x", "y", "health", "damage", "defense",
+                   "attack_range", "damage_range", "turn_actions_remaining", "level"]
+
+# team and type are string refs, every other field is an int32
+UNIT_RECORD = struct.Struct("<iHH" + "i" * (len(UNIT_FIELDS) - 3))
+BUILDING_RECORD = struct.Struct("<iHH" + "i" * (len(BUILDING_FIELDS) - 3))
+
+# a number that is an int in some replays and a float in others (balances become floats after a rat attack)
+INT_TAG = 0
+FLOAT_TAG = 1
+
+
+class StringTable:
+    '''Assigns a small index to every distinct string (team names, unit and building types, tiles)'''
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def ref(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE_REF
+
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+
+
+'''
+--------
+Encoding
+--------
+'''
+
+
+class Writer:
+    '''Accumulates the body; the string table is only known at the end so it is written in front afterwards'''
+
+    def __init__(self):
+        self.out = io.BytesIO()
+        self.strings = StringTable()
+
+    def pack(self, fmt: str, *values):
+        self.out.write(struct.pack("<" + fmt, *values))
+
+    def string(self, value: Optional[str]):
+        self.pack("H", self.strings.ref(value))
+
+    def number(self, value):
+        if isinstance(value, float):
+            self.pack("Bd", FLOAT_TAG, value)
+        else:
+            self.pack("Bq", INT_TAG, value)
+
+    def tiles(self, tiles: List[List[str]]):
+        self.out.write(array("H", [self.strings.ref(tile) for row in tiles for tile in row]).tobytes())
+
+    def named_numbers(self, values: Dict):
+        '''A small {team name: number} dict such as balances'''
+        self.pack("B", len(values))
+        for key, value in values.items():
+            self.string(key)
+            self.number(value)
+
+    def objects(self, teams: Dict[str, List[Dict]], fields: List[str], record: struct.Struct):
+        self.pack("B", len(teams))
+        for team, objects in teams.items():
+            self.string(team)
+            self.pack("I", len(objects))
+            for obj in objects:
+                self.out.write(record.pack(
+                    obj["id"], self.strings.ref(obj["team"]), self.strings.ref(obj["type"]), *[obj[field] for field in fields[3:]]
+                ))
+
+    def game_state(self, game_state: Dict):
+        self.named_numbers(game_state["balance"])
+        self.pack("ii", game_state["turn"], game_state["tile_size"])
+        self.objects(game_state["buildings"], BUILDING_FIELDS, BUILDING_RECORD)
+        self.objects(game_state["units"], UNIT_FIELDS, UNIT_RECORD)
+        self.pack("ii", game_state["red_main_castle_id"], game_state["blue_main_castle_id"])
+        self.named_numbers(game_state["time_remaining"])
+
+    def string_table(self) -> bytes:
+        out = io.BytesIO()
+        out.write(struct.pack("<I", len(self.strings.strings)))
+        for value in self.strings.strings:
+            encoded = value.encode("utf-8")
+            out.write(struct.pack("<H", len(encoded)))
+            out.write(encoded)
+        return out.getvalue()
+
+
+def encode_replay(data: Dict, compression: str = "zlib") -> bytes:
+    '''
+    Encodes a replay in the full JSON layout (as loaded from a .awap25r file) into the binary format
+    Delta replays must be expanded with expand_replay first
+    '''
+
+    writer = Writer()
+
+    writer.string(data.get("ID"))
+    writer.string(data.get("winner_color"))
+
+    tiles = data["map"]["tiles"]
+    writer.pack("HH", data["map"]["width"], data["map"]["height"])
+    writer.tiles(tiles)
+
+    changes = data.get("map-changes", {"changed-turns": [], "changed-maps": []})
+    writer.pack("I", len(changes["changed-turns"]))
+    for turn, changed_tiles in zip(changes["changed-turns"], changes["changed-maps"]):
+        writer.pack("i", turn)
+        writer.tiles(changed_tiles)
+
+    writer.pack("I", len(data["replay"]))
+    for step in data["replay"]:
+        if "game_state" not in step:
+            writer.pack("B", 0)
+            continue
+
+        writer.pack("BI", 1, step["turn_number"])
+        writer.game_state(step["game_state"])
+
+    body = writer.string_table() + writer.out.getvalue()
+
+    if compression == "zlib":
+        body = zlib.compress(body, 9)
+    elif compression == "lzma":
+        body = lzma.compress(body)
+    elif compression != "none":
+        raise ValueError(f"Unknown compression {compression}")
+
+    return MAGIC + struct.pack("<BB", VERSION, COMPRESSION[compression]) + body
+
+
+
+'''
+--------
+Decoding
+--------
+'''
+
+
+class Reader:
+    '''Reads the body back in the order it was written'''
+
+    def __init__(self, body: bytes):
+        self.body = memoryview(body)
+        self.offset = 0
+        self.strings: List[str] = []
+
+        count, = self.unpack("I")
+        for _ in range(count):
+            length, = self.unpack("H")
+            self.strings.append(bytes(self.body[self.offset:self.offset + length]).decode("utf-8"))
+            self.offset += length
+
+    def unpack(self, fmt: str) -> tuple:
+        values = struct.unpack_from("<" + fmt, self.body, self.offset)
+        self.offset += struct.calcsize("<" + fmt)
+        return values
+
+    def string(self) -> Optional[str]:
+        ref, = self.unpack("H")
+        return None if ref == NONE_REF else self.strings[ref]
+
+    def number(self):
+        tag, = self.unpack("B")
+        return self.unpack("d" if tag == FLOAT_TAG else "q")[0]
+
+    def tiles(self, width: int, height: int) -> List[List[str]]:
+        refs = array("H")
+        refs.frombytes(bytes(self.body[self.offset:self.offset + 2 * width * height]))
+        self.offset += 2 * width * height
+        return [[self.strings[ref] for ref in refs[x * height:(x + 1) * height]] for x in range(width)]
+
+    def named_numbers(self) -> Dict:
+        count, = self.unpack("B")
+        values = {}
+        for _ in range(count):
+            key = self.string()
+            values[key] = self.number()
+        return values
+
+    def objects(self, fields: List[str], record: struct.Struct) -> Dict[str, List[Dict]]:
+        team_count, = self.unpack("B")
+        teams = {}
+        for _ in range(team_count):
+            team = self.string()
+            count, = self.unpack("I")
+
+            objects = []
+            for _ in range(count):
+                values = list(record.unpack_from(self.body, self.offset))
+                self.offset += record.size
+                values[1] = self.strings[values[1]]
+                values[2] = self.strings[values[2]]
+                objects.append(dict(zip(fields, values)))
+
+            teams[team] = objects
+        return teams
+
+    def game_state(self) -> Dict:
+        balance = self.named_numbers()
+        turn, tile_size = self.unpack("ii")
+        buildings = self.objects(BUILDING_FIELDS, BUILDING_RECORD)
+        units = self.objects(UNIT_FIELDS, UNIT_RECORD)
+        red_main_castle_id, blue_main_castle_id = self.unpack("ii")
+        time_remaining = self.named_numbers()
+
+        #same key order as GameState.to_dict
+        return {
+            "balance": balance,
+            "turn": turn,
+            "tile_size": tile_size,
+            "buildings": buildings,
+            "units": units,
+            "red_main_castle_id": red_main_castle_id,
+            "blue_main_castle_id": blue_main_castle_id,
+            "time_remaining": time_remaining,
+        }
+
+
+def is_binary_replay(head: bytes) -> bool:
+    '''True if the first bytes of a file are those of a binary replay'''
+    return head.startswith(MAGIC)
+
+
+def decode_replay(blob: bytes) -> Dict:
+    '''Decodes a binary replay into the full JSON layout read by replay_game_cli.py'''
+
+    if not is_binary_replay(blob):
+        raise ValueError("Not a binary replay")
+
+    version, compression = struct.unpack_from("<BB", blob, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary replay version {version}")
+
+    body = blob[len(MAGIC) + 2:]
+    if compression == COMPRESSION["zlib"]:
+        body = zlib.decompress(body)
+    elif compression == COMPRESSION["lzma"]:
+        body = lzma.decompress(body)
+
+    reader = Reader(body)
+
+    replay_id = reader.string()
+    winner_color = reader.string()
+
+    width, height = reader.unpack("HH")
+    map_data = {"width": width, "height": height, "tiles": reader.tiles(width, height)}
+
+    changed_turns = []
+    changed_maps = []
+    change_count, = reader.unpack("I")
+    for _ in range(change_count):
+        changed_turns.append(reader.unpack("i")[0])
+        changed_maps.append(reader.tiles(width, height))
+
+    replay = []
+    turn_count, = reader.unpack("I")
+    for _ in range(turn_count):
+        flag, = reader.unpack("B")
+        if flag == 0:
+            replay.append({})
+            continue
+
+        turn_number, = reader.unpack("I")
+        replay.append({"turn_number": turn_number, "game_state": reader.game_state()})
+
+    return {
+        "ID": replay_id,
+        "map": map_data,
+        "map-changes": {
+            "changed-turns": changed_turns,
+            "changed-maps": changed_maps
+        },
+        "winner_color": winner_color,
+        "replay": replay,
+    }
@@ -0,0 +1,152 @@
+''' content-addressed cache of game results, so unchanged matchups are not played again '''
+
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import functools
+from typing import Dict, Optional
+
+
+def hash_file(path: str) -> str:
+    '''sha256 of a file's contents'''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def engine_hash() -> str:
+    '''
+    Hash of the engine source (every .py file in src/), so any engine change invalidates the cache
+    Computed once per process
+    '''
+    digest = hashlib.sha256()
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(src_dir, "*.py"))):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(hash_file(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    '''
+    Stores the result and replay of finished games under a key derived from everything that decides them:
+    both bot files, the map file, the engine source and the game options
+
+    Each entry is a directory <cache_dir>/<key>/ holding result.json and the replay. Entries not used for
+    max_age seconds are dropped, and the least recently used ones go once the cache exceeds max_bytes.
+
+    Bots that use randomness do not play the same game twice; a cached result is then one sample of the matchup.
+    '''
+
+    RESULT_FILE = "result.json"
+    REPLAY_FILE = "replay.awap25r"
+
+    def __init__(self, cache_dir: str, max_age: float = 7 * 24 * 3600, max_bytes: int = 1 << 30):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, blue_path: str, red_path: str, map_path: str, options: Optional[Dict] = None) -> str:
+        '''The cache key of a game: changes if a bot, the map, the engine or an option changes'''
+        parts = {
+            "engine": engine_hash(),
+            "blue": hash_file(blue_path),
+            "red": hash_file(red_path),
+            "map": hash_file(map_path),
+            "options": options or {},
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str, replay_path: Optional[str] = None) -> Optional[Dict]:
+        '''
+        Returns the stored result of a game, or None if it is not cached (or has expired)
+        The stored replay is copied to replay_path if given
+        '''
+        entry = self.entry_dir(key)
+        result_path = os.path.join(entry, self.RESULT_FILE)
+
+        try:
+            if time.time() - os.path.getmtime(entry) > self.max_age:
+                return None
+
+            with open(result_path, 'r') as f:
+                result = json.load(f)
+
+            if replay_path is not None:
+                replay_dir = os.path.dirname(replay_path)
+                if replay_dir:
+                    os.makedirs(replay_dir, exist_ok=True)
+                shutil.copyfile(os.path.join(entry, self.REPLAY_FILE), replay_path)
+        except (OSError, ValueError):
+            #missing, expired by another process while reading, or half written
+            return None
+
+        #mark as recently used for eviction
+        now = time.time()
+        os.utime(entry, (now, now))
+        return result
+
+    def put(self, key: str, result: Dict, replay_path: Optional[str] = None):
+        '''Stores the result of a game and a copy of its replay, then evicts old entries'''
+
+        entry = self.entry_dir(key)
+
+        #written next to the entry and renamed into place, so readers never see a partial entry
+        staging = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        if replay_path is not None and os.path.exists(replay_path):
+            shutil.copyfile(replay_path, os.path.join(staging, self.REPLAY_FILE))
+
+        with open(os.path.join(staging, self.RESULT_FILE), 'w') as f:
+            json.dump(result, f)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            #another process stored the same game first
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self):
+        '''Drops entries not used for max_age, then the least recently used ones until the cache fits in max_bytes'''
+
+        now = time.time()
+        entries = []
+
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp") or not os.path.isdir(entry):
+                continue
+
+            try:
+                last_used = os.path.getmtime(entry)
+                size = sum(os.path.getsize(os.path.join(entry, file)) for file in os.listdir(entry))
+            except OSError:
+                continue #removed by another process
+
+            if now - last_used > self.max_age:
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entries.append((last_used, size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -3,17 +3,20 @@ This file contains all the functions that a player can call in their bot
 '''
 
 import copy, math
+import inspect
 from typing import List, Optional, Dict, Tuple
 
 from src.exceptions import GameException
 
-from src.game_constants import Team, UnitType, BuildingType, Direction, Tile
+from src.game_constants import Team, UnitType, BuildingType, Direction, Tile, ActionType
 from src.map import Map
 
 from src.units import Unit
 from src.buildings import Building
 from src.game_constants import GameConstants
 from src.game_state import GameState
+from src.views import unit_view, building_view, unit_views, building_views
+from src.pathfinding import UNREACHABLE
 
 
 class RobotController:
@@ -47,13 +50,16 @@ class RobotController:
     
 
     def get_map(self) -> Map:
-        '''Returns a deep copy of the current map instance'''
-        return copy.deepcopy(self.__game_state.map)
+        '''
+        Returns a read-only snapshot of the current map
+        The same snapshot is shared until a bridge is built, so this is free to call every turn
+        '''
+        return self.__game_state.map.snapshot()
     
 
     def get_units(self, team: Team) -> List[Unit]:
         '''Gets a list of the specified team's available units'''
-        return copy.deepcopy(list(self.__game_state.units[team].values()))
+        return unit_views(self.__game_state.units[team].values())
     
     def get_unit_ids(self, team: Team) -> List[int]:
         '''Gets a list of the specified team's available unit ids'''
@@ -62,7 +68,7 @@ class RobotController:
 
     def get_buildings(self, team: Team) -> List[Building]:
         '''Gets a list of the specified team's available buildings'''
-        return copy.deepcopy(list(self.__game_state.buildings[team].values()))
+        return building_views(self.__game_state.buildings[team].values())
     
     def get_building_ids(self, team: Team) -> List[Building]:
         '''Gets a list of the specified team's available building ids'''
@@ -108,18 +114,34 @@ class RobotController:
 
     def get_unit_from_id(self, unit_id: int) -> Optional[Unit]:
         '''
-        Returns a copy of the unit given by its id
+        Returns a read-only view of the unit given by its id
         '''
-        return copy.deepcopy(self.__game_state.get_unit_from_id(unit_id))
+        return unit_view(self.__game_state.get_unit_from_id(unit_id))
     
 
     def get_building_from_id(self, building_id: int) -> Optional[Building]:
         '''
-        Returns a copy of the building given by its id
+        Returns a read-only view of the building given by its id
         '''
-        return copy.deepcopy(self.__game_state.get_building_from_id(building_id))
+        return building_view(self.__game_state.get_building_from_id(building_id))
     
 
+    def get_unit_id_at(self, x: int, y: int) -> Optional[int]:
+        '''
+        Returns the id of the unit (of either team) standing on (x, y), or None if there is none
+        Use get_team_of_unit to find out whose it is
+        '''
+        return self.__game_state.get_unit_id_at(x, y)
+
+
+    def get_building_id_at(self, x: int, y: int) -> Optional[int]:
+        '''
+        Returns the id of the building (of either team) on (x, y), or None if there is none
+        Use get_team_of_building to find out whose it is
+        '''
+        return self.__game_state.get_building_id_at(x, y)
+
+
     def get_id_from_unit(self, unit: Unit) -> Tuple[Team, int]:
         '''
         Returns (unit team, unit ID) from a given unit
@@ -181,14 +203,7 @@ class RobotController:
         if radius < 0:
             raise GameException("Radius must be non-negative")
 
-        in_range: List[Unit] = []
-
-        for unit in self.__game_state.units[team].values():
-            #if chebyshev distance between unit and (x, y) <= radius, then valid
-            if self.chebyshev_distance_valid(unit.x, unit.y, x, y, radius):
-                in_range.append(copy.deepcopy(unit))
-
-        return in_range
+        return unit_views(self.__game_state.units_within_radius(team, x, y, radius))
 
 
 
@@ -202,14 +217,7 @@ class RobotController:
         if radius < 0:
             raise GameException("Radius must be non-negative")
         
-        in_range: List[Building] = []
-
-        for building in self.__game_state.buildings[team].values():
-            #if chebyshev distance between building and (x, y) <= radius, then valid
-            if self.chebyshev_distance_valid(building.x, building.y, x, y, radius):
-                in_range.append(copy.deepcopy(building))
-
-        return in_range
+        return building_views(self.__game_state.buildings_within_radius(team, x, y, radius))
 
     def sense_objects_within_radius(self, team: Team, x: int, y: int, radius: int) -> Tuple[List[Unit], List[Building]]:
         '''
@@ -228,7 +236,7 @@ class RobotController:
         '''
 
         if unit_id not in self.__game_state.units[team]:
-            print("sense_objects_within_unit_range(): Not valid unit_id")
+            self.__game_state.diagnostics.info("sense_objects_within_unit_range(): Not valid unit_id")
             return ([], []) # returns nothing if unit_id is invalid
         
         unit = self.__game_state.units[team][unit_id]
@@ -242,7 +250,7 @@ class RobotController:
         Distance is calculated such that the euclidian distance between the object and the point must be less than or equal to radius
         '''
         if building_id not in self.__game_state.buildings[team]:
-            print("sense_objects_within_building_range(): Not valid building id")
+            self.__game_state.diagnostics.info("sense_objects_within_building_range(): Not valid building id")
             return ([], []) # returns nothing if building_id is invalid
         
         unit = self.__game_state.units[team][building_id]
@@ -269,7 +277,7 @@ class RobotController:
 
         # basic validity
         if building is None:
-            print('can_spawn_unit(): invalid building id')
+            self.__game_state.diagnostics.info('can_spawn_unit(): invalid building id')
             return False
 
         #check if building's team is correct
@@ -305,11 +313,11 @@ class RobotController:
 
         #checks if (x, y) are valid coordinates
         if not self.__game_state.map.in_bounds(x, y):
-            print('can_build_building(): (x, y) given are out of bounds')
+            self.__game_state.diagnostics.info('can_build_building(): (x, y) given are out of bounds')
             return False
 
         #checks if building can be built
-        if building_type.placeable_tiles is not None and self.__game_state.map.tiles[x][y] not in building_type.placeable_tiles:
+        if not self.__game_state.rules.passable[building_type.placement_class][x][y]:
             return False
 
         #checks for other units and tile type
@@ -335,12 +343,12 @@ class RobotController:
     
         #check validity
         if not self.can_spawn_unit(unit_type, building_id):
-            print("spawn_unit() called but can_spawn_unit() returned False")
+            self.__game_state.diagnostics.info("spawn_unit() called but can_spawn_unit() returned False")
             return False
         
         #spawn unit
         if not self.__game_state.spawn_unit(self.__team, unit_type, building_id):
-            print("unit failed to spawn")
+            self.__game_state.diagnostics.info("unit failed to spawn")
             return False
         
         # decrease balance
@@ -353,12 +361,12 @@ class RobotController:
         
         #check validity
         if not self.can_build_building(building_type, x, y):
-            print("build_building() called but can_build_building() returned False")
+            self.__game_state.diagnostics.info("build_building() called but can_build_building() returned False")
             return False
         
         #build building
         if not self.__game_state.place_building(self.__team, building_type, x, y):
-            print("building failed to place because another building on tile or built on wrong tile type")
+            self.__game_state.diagnostics.info("building failed to place because another building on tile or built on wrong tile type")
             return False
 
         #decrease balance
@@ -401,7 +409,7 @@ class RobotController:
         '''
 
         if unit_id not in self.__game_state.units[self.__team]:
-            print('disband_unit(): Invalid unit_id')
+            self.__game_state.diagnostics.info('disband_unit(): Invalid unit_id')
             return False
         
         self.__game_state.delete_unit(self.__team, unit_id)
@@ -416,11 +424,11 @@ class RobotController:
         '''
 
         if building_id not in self.__game_state.buildings[self.__team]:
-            print('destroy_building(): Invalid building_id')
+            self.__game_state.diagnostics.info('destroy_building(): Invalid building_id')
             return False
         
         if building_id == self.__game_state.main_castle_ids[self.__team]:
-            print('You cannot destroy your own main castle!')
+            self.__game_state.diagnostics.info('You cannot destroy your own main castle!')
             return False
         
         self.__game_state.delete_building(self.__team, building_id)
@@ -447,11 +455,11 @@ class RobotController:
 
         # are ids valid?
         if attacking_unit_id not in self.__game_state.units[self.__team]:
-            print("can_unit_attack_unit(): invalid attacking_unit_id")
+            self.__game_state.diagnostics.info("can_unit_attack_unit(): invalid attacking_unit_id")
             return False
         
         if target_unit_id not in self.__game_state.units[self.get_enemy_team()]:
-            print("can_unit_attack_unit(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("can_unit_attack_unit(): invalid target_unit_id")
             return False
 
 
@@ -460,11 +468,11 @@ class RobotController:
 
         # basic validity
         if attacking_unit is None:
-            print('can_unit_attack_unit(): invalid attacking unit id')
+            self.__game_state.diagnostics.info('can_unit_attack_unit(): invalid attacking unit id')
             return False
         
         if target_unit is None:
-            print('can_unit_attack_unit(): invalid target unit id')
+            self.__game_state.diagnostics.info('can_unit_attack_unit(): invalid target unit id')
             return False
 
 
@@ -489,11 +497,11 @@ class RobotController:
 
         # are ids valid?
         if attacking_unit_id not in self.__game_state.units[self.__team]:
-            print("can_unit_attack_building(): invalid attacking_unit_id")
+            self.__game_state.diagnostics.info("can_unit_attack_building(): invalid attacking_unit_id")
             return False
         
         if target_building_id not in self.__game_state.buildings[self.get_enemy_team()]:
-            print("can_unit_attack_building(): invalid target_building_id")
+            self.__game_state.diagnostics.info("can_unit_attack_building(): invalid target_building_id")
             return False
 
 
@@ -503,11 +511,11 @@ class RobotController:
 
         # basic validity
         if attacking_unit is None:
-            print('can_spawn_unit(): invalid attacking unit id')
+            self.__game_state.diagnostics.info('can_spawn_unit(): invalid attacking unit id')
             return False
 
         if target_building is None:
-            print('can_unit_attack_building(): invalid target building id')
+            self.__game_state.diagnostics.info('can_unit_attack_building(): invalid target building id')
             return False
 
         # has unit attacked this turn?
@@ -531,19 +539,19 @@ class RobotController:
 
         # are ids valid?
         if attacking_unit_id not in self.__game_state.units[self.__team]:
-            print("can_unit_attack_building(): invalid attacking_unit_id")
+            self.__game_state.diagnostics.info("can_unit_attack_building(): invalid attacking_unit_id")
             return False
         
         # are locations valid?
         if not self.__game_state.map.in_bounds(x, y):
-            print('can_unit_attack_location(): invalid (x, y) given')
+            self.__game_state.diagnostics.info('can_unit_attack_location(): invalid (x, y) given')
             return False
         
         attacking_unit = self.__game_state.get_unit_from_id(attacking_unit_id)
 
         # basic validity
         if attacking_unit is None:
-            print('can_unit_attack_location(): invalid attacking unit id')
+            self.__game_state.diagnostics.info('can_unit_attack_location(): invalid attacking unit id')
             return False
 
         # has unit attacked this turn?
@@ -566,11 +574,11 @@ class RobotController:
         '''
         # are ids valid?
         if attacking_building_id not in self.__game_state.buildings[self.__team]:
-            print("can_building_attack_unit(): invalid attacking_building_id")
+            self.__game_state.diagnostics.info("can_building_attack_unit(): invalid attacking_building_id")
             return False
         
         if target_unit_id not in self.__game_state.units[self.get_enemy_team()]:
-            print("can_building_attack_unit(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("can_building_attack_unit(): invalid target_unit_id")
             return False
 
 
@@ -579,11 +587,11 @@ class RobotController:
 
         # basic validity
         if attacking_building is None:
-            print('can_building_attack_unit(): invalid attacking building id')
+            self.__game_state.diagnostics.info('can_building_attack_unit(): invalid attacking building id')
             return False
 
         if target_unit is None:
-            print('can_building_attack_unit(): invalid target unit id')
+            self.__game_state.diagnostics.info('can_building_attack_unit(): invalid target unit id')
             return False
 
         # has unit attacked this turn?
@@ -608,11 +616,11 @@ class RobotController:
 
         # are ids valid?
         if attacking_building_id not in self.__game_state.buildings[self.__team]:
-            print("can_building_attack_location(): invalid attacking_building_id")
+            self.__game_state.diagnostics.info("can_building_attack_location(): invalid attacking_building_id")
             return False
         
         if not self.__game_state.map.in_bounds(x, y):
-            print('can_unit_attack_location(): invalid (x, y) given')
+            self.__game_state.diagnostics.info('can_unit_attack_location(): invalid (x, y) given')
             return False
 
 
@@ -620,7 +628,7 @@ class RobotController:
 
         # basic validity
         if attacking_building is None:
-            print('can_building_attack_location(): invalid attacking building id')
+            self.__game_state.diagnostics.info('can_building_attack_location(): invalid attacking building id')
             return False
 
         # has unit attacked this turn?
@@ -656,26 +664,19 @@ class RobotController:
         attacking_unit = self.__game_state.get_unit_from_id(attacking_unit_id)
 
         # basic validity
-        if attacking_unit is None: 
+        if attacking_unit is None:
             return False
 
-
-        # get all opponents within damage range
+        # get all opponents within damage range (chebyshev distance to target <= damage range)
         #list of ids
-        opponent_units_hit: List[int] = []
-        opponent_buildings_hit: List[int] = []
-
+        opponent_units_hit: List[int] = self.__game_state.unit_index[enemy_team].query(x, y, attacking_unit.damage_range)
+        opponent_buildings_hit: List[int] = self.__game_state.building_index[enemy_team].query(x, y, attacking_unit.damage_range)
 
-        #sense all opponents hit
-        for unit in self.__game_state.units[enemy_team].values():
-            #if chebyshev distance between unit and target <= damage range, then hit
-            if self.chebyshev_distance_valid(unit.x, unit.y, x, y, attacking_unit.damage_range):
-                opponent_units_hit.append(unit.id)
-
-        for building in self.__game_state.buildings[enemy_team].values():
-            #if chebyshev distance between unit and target <= damage range, then hit
-            if self.chebyshev_distance_valid(building.x, building.y, x, y, attacking_unit.damage_range):
-                opponent_buildings_hit.append(building.id)
+        if self.__game_state.columnar and len(opponent_units_hit) + len(opponent_buildings_hit) >= self.__game_state.BATCH_ATTACK_MIN_HITS:
+            #hits, damage, kills and retaliation in one pass over the store arrays
+            attacking_unit.turn_actions_remaining -= 1
+            self.__game_state.resolve_unit_attack(attacking_unit, enemy_team, x, y)
+            return True
 
         #unit actions per turn decrement
         attacking_unit.turn_actions_remaining -= 1
@@ -710,7 +711,7 @@ class RobotController:
 
             # basic validity
             if enemy_unit is None:
-                print('unit_attack_location(): invalid enemy unit id')
+                self.__game_state.diagnostics.info('unit_attack_location(): invalid enemy unit id')
                 return False
             
             #if attacking unit is out of range of retaliation, move on
@@ -726,7 +727,7 @@ class RobotController:
 
             # basic validity
             if enemy_building is None:
-                print('unit_attack_location(): invalid enemy building id')
+                self.__game_state.diagnostics.info('unit_attack_location(): invalid enemy building id')
                 return False
             
             #if the attacking building is out of range of retaliation, move on
@@ -816,15 +817,9 @@ class RobotController:
             return False
 
 
-        # get all opponents within damage range
+        # get all opponents (only units) within damage range (chebyshev distance to target <= damage range)
         #list of ids
-        opponent_units_hit: List[int] = []
-
-        #sense all opponents (only units) hit
-        for unit in self.__game_state.units[enemy_team].values():
-            #if chebyshev distance between unit and target <= damage range, then hit
-            if self.chebyshev_distance_valid(unit.x, unit.y, x, y, attacking_building.damage_range):
-                opponent_units_hit.append(unit.id)
+        opponent_units_hit: List[int] = self.__game_state.unit_index[enemy_team].query(x, y, attacking_building.damage_range)
 
 
         #buliding actions per turn decrement
@@ -899,16 +894,15 @@ class RobotController:
     def unit_possible_move_directions(self, unit_id: int) -> list[Direction]:
         '''
         Given an ALLY unit id (and thus its location), return a list of valid directions that the unit can move in
+        Read from the legal moves kept by the engine for the team playing, so this is a lookup
         '''
 
-        res = []
+        directions = self.__game_state.legal_moves.directions(self.__team, unit_id)
+        if directions is None:
+            self.__game_state.diagnostics.info("unit_possible_move_directions(): invalid ally unit_id")
+            return []
 
-        #check each direction
-        for dir in Direction:
-            if self.can_move_unit_in_direction(unit_id, dir):
-                res.append(dir)
-        
-        return res
+        return list(directions)
         
 
 
@@ -921,28 +915,22 @@ class RobotController:
         '''
         
         # is id valid?
-        if unit_id not in self.__game_state.units[self.__team]:
-            print("can_move_unit_in_direction(): invalid ally unit_id")
-            return False
-
-
-        unit = self.__game_state.get_unit_from_id(unit_id)
-        
-        #basic validity
+        unit = self.__game_state.units[self.__team].get(unit_id)
         if unit is None:
+            self.__game_state.diagnostics.info("can_move_unit_in_direction(): invalid ally unit_id")
             return False
-        
+
 
         #check if the ending position is valid
-        dest_x, dest_y = self.new_location(unit.x, unit.y, direction)
+        dest_x, dest_y = unit.x + direction.dx, unit.y + direction.dy
 
         if not self.__game_state.map.in_bounds(dest_x, dest_y):
             # print(f'Destination ({dest_x}, {dest_y}) out of bounds')
             return False
         
         #check if unit can walk on tile
-        dest_tile: Tile = self.__game_state.map.tiles[dest_x][dest_y]
-        if dest_tile not in unit.walkable_tiles:
+        rules = self.__game_state.rules
+        if not rules.passable[unit.type.walk_class][dest_x][dest_y]:
             return False
         
         # if another unit is occupying the new space (that isn't the one that it is occupying right now), return false
@@ -950,7 +938,7 @@ class RobotController:
             return False
 
         #check unit's movement range left for the turn
-        if unit.turn_movement_remaining - dest_tile.movement_cost < 0:
+        if unit.turn_movement_remaining - rules.movement_cost[dest_x][dest_y] < 0:
             # print(f'{unit_id} has no movement left on its turn')
             return False
 
@@ -968,30 +956,193 @@ class RobotController:
         if not self.can_move_unit_in_direction(unit_id, direction):
             return False
         
-        unit = self.__game_state.get_unit_from_id(unit_id)
-        
-        #basic validity
-        if unit is None:
-            return False
-        
-        dest_x, dest_y = self.new_location(unit.x, unit.y, direction)
+        #validated as an ally unit above
+        unit = self.__game_state.units[self.__team][unit_id]
+        dest_x, dest_y = unit.x + direction.dx, unit.y + direction.dy
 
         #reduce unit movements
-        dest_tile: Tile = self.__game_state.map.tiles[dest_x][dest_y]
-        unit.turn_movement_remaining -= dest_tile.movement_cost
+        unit.turn_movement_remaining -= self.__game_state.rules.movement_cost[dest_x][dest_y]
 
-        # update unit_pleaceable map (old is now free)
-        self.__game_state.unit_placeable_map[unit.x][unit.y] = True
+        #update location, placeable map and spatial index
+        return self.__game_state.move_unit(unit_id, dest_x, dest_y)
 
-        #update location
-        unit.x = dest_x
-        unit.y = dest_y
 
-        # update unit_pleaceable map (new is now taken)
-        self.__game_state.unit_placeable_map[unit.x][unit.y] = False
+    def move_units_toward(self, unit_ids: List[int], x: int, y: int) -> List[bool]:
+        '''
+        Moves each of the given ALLY units toward (x, y) along the cheapest walk for its unit type, as far as its
+        movement left this turn allows; every step goes through move_unit_in_direction
+        A unit whose best step is taken by another unit steps to another tile that still brings it closer, if any
+
+        Units closest to (x, y) move first, ties broken by id, and blocked units retry after the others have moved,
+        so the outcome only depends on the game state and the ids given
+
+        Returns, in the order of unit_ids, whether each unit moved
+        '''
+        moved = {unit_id: False for unit_id in unit_ids}
+
+        if not self.__game_state.map.in_bounds(x, y):
+            self.__game_state.diagnostics.info("move_units_toward(): ({}, {}) given are out of bounds", x, y)
+            return [False] * len(unit_ids)
+
+        units = self.__game_state.units[self.__team]
+        height = self.__game_state.map.height
+
+        #one flow field per walk class, shared by every unit of that class
+        marching = []
+        for unit_id in moved:
+            unit = units.get(unit_id)
+            if unit is None:
+                self.__game_state.diagnostics.info("move_units_toward(): invalid ally unit_id")
+                continue
+            marching.append((unit, self.__game_state.pathfinder.flow_field(unit.type.walk_class, x, y)))
+
+        advanced = True
+        while advanced:
+            advanced = False
+            marching.sort(key=lambda entry: (entry[1].distance[entry[0].x * height + entry[0].y], entry[0].id))
+            for unit, field in marching:
+                while self.__step_along(unit, field, height):
+                    moved[unit.id] = True
+                    advanced = True
+
+        return [moved[unit_id] for unit_id in unit_ids]
+
+    def __step_along(self, unit: Unit, field, height: int) -> bool:
+        '''Moves unit one step to the free neighbor closest to the flow field's target; False if no step gets closer'''
+        here = field.distance[unit.x * height + unit.y]
+        if here == UNREACHABLE:
+            return False
+
+        steps = []
+        for direction in Direction:
+            dest_x, dest_y = unit.x + direction.dx, unit.y + direction.dy
+            if direction == Direction.STAY or not self.__game_state.map.in_bounds(dest_x, dest_y):
+                continue
+            distance = field.distance[dest_x * height + dest_y]
+            if distance != UNREACHABLE and distance < here:
+                steps.append((distance, len(steps), direction))
+
+        for _, _, direction in sorted(steps):
+            if self.move_unit_in_direction(unit.id, direction):
+                return True
+        return False
+
+
+    '''
+    -----------
+    Pathfinding
+    -----------
+    '''
+
+    def get_path_distance(self, unit_id: int, x: int, y: int, avoid_units: bool = True) -> Optional[int]:
+        '''
+        Given an ALLY unit id, the total movement cost of the cheapest walk from the unit to (x, y)
+        Only tiles of the unit's walkable_tiles are used, and with avoid_units tiles holding another unit are not entered
+
+        Returns None if (x, y) cannot be reached
+        '''
+        field = self.__unit_distance_field(unit_id, x, y, avoid_units)
+        if field is None:
+            return None
+        return field.distance_to(x, y)
+
+    def get_shortest_path(self, unit_id: int, x: int, y: int, avoid_units: bool = True) -> Optional[List[Tuple[int, int]]]:
+        '''
+        Given an ALLY unit id, the tiles of the cheapest walk from the unit to (x, y), as in get_path_distance
+        The unit's own tile is not included and (x, y) is the last tile, so an empty list means the unit is already there
+
+        Returns None if (x, y) cannot be reached
+        '''
+        field = self.__unit_distance_field(unit_id, x, y, avoid_units)
+        if field is None:
+            return None
+        return field.path_to(x, y)
+
+    def get_castle_distance(self, team: Team, unit_type: UnitType, x: int, y: int) -> Optional[int]:
+        '''
+        Total movement cost for a unit of unit_type on (x, y) to walk onto team's main castle, ignoring other units
+        Precomputed for every tile and kept up to date as bridges are built, so this is a constant time lookup
+
+        Returns None if (x, y) is out of bounds or the castle cannot be reached from it
+        '''
+        if not self.__game_state.map.in_bounds(x, y):
+            self.__game_state.diagnostics.info("get_castle_distance(): ({}, {}) given are out of bounds", x, y)
+            return None
+        return self.__game_state.castle_distances.field(team, unit_type.walk_class).distance_to(x, y)
+
+    def in_same_region(self, unit_type: UnitType, x1: int, y1: int, x2: int, y2: int) -> bool:
+        '''
+        Whether a unit of unit_type could walk from (x1, y1) to (x2, y2), ignoring other units and movement costs
+        Regions are kept up to date as bridges are built, so this is a constant time lookup
+
+        Returns False if either tile is out of bounds or not walkable for unit_type
+        '''
+        if not self.__game_state.map.in_bounds(x1, y1) or not self.__game_state.map.in_bounds(x2, y2):
+            self.__game_state.diagnostics.info("in_same_region(): ({}, {}) or ({}, {}) given are out of bounds", x1, y1, x2, y2)
+            return False
+        return self.__game_state.regions.same_region(unit_type.walk_class, x1, y1, x2, y2)
+
+    def get_region_size(self, unit_type: UnitType, x: int, y: int) -> int:
+        '''
+        Number of tiles a unit of unit_type on (x, y) could walk to, its own included, ignoring other units
+
+        Returns 0 if (x, y) is out of bounds or not walkable for unit_type
+        '''
+        if not self.__game_state.map.in_bounds(x, y):
+            self.__game_state.diagnostics.info("get_region_size(): ({}, {}) given are out of bounds", x, y)
+            return 0
+        return self.__game_state.regions.region_size(unit_type.walk_class, x, y)
+
+    def __unit_distance_field(self, unit_id: int, x: int, y: int, avoid_units: bool):
+        '''Validates a path query; returns the unit's cached distance field, None if the query is invalid'''
+        unit = self.__game_state.units[self.__team].get(unit_id)
+        if unit is None:
+            self.__game_state.diagnostics.info("pathfinding: invalid ally unit_id")
+            return None
+
+        if not self.__game_state.map.in_bounds(x, y):
+            self.__game_state.diagnostics.info("pathfinding: ({}, {}) given are out of bounds", x, y)
+            return None
+
+        return self.__game_state.pathfinder.field(unit.type.walk_class, unit.x, unit.y, avoid_units)
+
+
+    '''
+    -----------
+    Threat maps
+    -----------
+    '''
+
+    def get_threat_map(self) -> List[List[int]]:
+        '''
+        Returns a 2D map of how many enemy units and buildings can damage (x, y) with one attack,
+        counting area damage (attack_range + damage_range); those dealing no damage are not counted
+        '''
+        threat, _ = self.__game_state.threat_maps.grids(self.get_enemy_team())
+        return [column[:] for column in threat]
+
+    def get_damage_map(self) -> List[List[int]]:
+        '''
+        Returns a 2D map of the most damage (x, y) can take from the enemy in one turn,
+        if every enemy unit and building that can reach it attacks it with all of its actions
+        '''
+        _, damage = self.__game_state.threat_maps.grids(self.get_enemy_team())
+        return [column[:] for column in damage]
+
+    def get_threat_at(self, x: int, y: int) -> int:
+        '''Entry (x, y) of get_threat_map, without copying the map; 0 if out of bounds'''
+        if not self.__game_state.map.in_bounds(x, y):
+            return 0
+        threat, _ = self.__game_state.threat_maps.grids(self.get_enemy_team())
+        return threat[x][y]
+
+    def get_damage_at(self, x: int, y: int) -> int:
+        '''Entry (x, y) of get_damage_map, without copying the map; 0 if out of bounds'''
+        if not self.__game_state.map.in_bounds(x, y):
+            return 0
+        _, damage = self.__game_state.threat_maps.grids(self.get_enemy_team())
+        return damage[x][y]
 
-        return True
-    
 
     '''
     ---------------------------
@@ -1003,7 +1154,7 @@ class RobotController:
         '''Returns True if unit is an explorer on an exploration building, False otherwise'''
 
         if explorer_unit_id not in self.__game_state.units[self.__team]:
-            print("can_explore(): invalid explorer_unit_id")
+            self.__game_state.diagnostics.info("can_explore(): invalid explorer_unit_id")
             return False
 
         explorer = self.__game_state.get_unit_from_id(explorer_unit_id)
@@ -1020,7 +1171,7 @@ class RobotController:
 
         # basic validity
         if building is None:
-            print('can_explore(): invalid building id')
+            self.__game_state.diagnostics.info('can_explore(): invalid building id')
             return False
         
         if building.type != BuildingType.EXPLORER_BUILDING:
@@ -1067,7 +1218,7 @@ class RobotController:
         
 
         if target_unit_id not in self.__game_state.units[self.__team]:
-            print("explore_for_health(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("explore_for_health(): invalid target_unit_id")
             return False
 
         unit = self.__game_state.get_unit_from_id(target_unit_id)
@@ -1096,7 +1247,7 @@ class RobotController:
         
 
         if target_unit_id not in self.__game_state.units[self.__team]:
-            print("explore_for_health(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("explore_for_health(): invalid target_unit_id")
             return False
 
         unit = self.__game_state.get_unit_from_id(target_unit_id)
@@ -1123,7 +1274,7 @@ class RobotController:
         
 
         if target_unit_id not in self.__game_state.units[self.__team]:
-            print("explore_for_health(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("explore_for_health(): invalid target_unit_id")
             return False
 
         unit = self.__game_state.get_unit_from_id(target_unit_id)
@@ -1150,27 +1301,27 @@ class RobotController:
         # Ensure unit ID is valid and of type Engineer
         # are ids valid?
         if engineer_id not in self.__game_state.units[self.__team]:
-            print("can_build_bridge(): invalid engineer_id")
+            self.__game_state.diagnostics.info("can_build_bridge(): invalid engineer_id")
             return False
         
         engineer = self.__game_state.get_unit_from_id(engineer_id)
 
         # basic validity
         if engineer is None:
-            print('can_build_bridge(): invalid attacking unit id')
+            self.__game_state.diagnostics.info('can_build_bridge(): invalid attacking unit id')
             return False
         
         #robustly checks ally team control, but is tested for in the first check
         if engineer.team != self.__team:
-            print('can_build_bridge(): can only control ally engineers')
+            self.__game_state.diagnostics.info('can_build_bridge(): can only control ally engineers')
         
         if engineer.type != UnitType.ENGINEER:
-            print('can_build_bridge(): unit is not an engineer')
+            self.__game_state.diagnostics.info('can_build_bridge(): unit is not an engineer')
             return False
 
         # Check if the target tile is a WATER tile
         if not self.__game_state.map.is_tile_type(engineer.x, engineer.y, Tile.WATER):
-            print("can_build_bridge(): Target tile is not WATER")
+            self.__game_state.diagnostics.info("can_build_bridge(): Target tile is not WATER")
             return False
 
         return True
@@ -1184,16 +1335,12 @@ class RobotController:
         
         engineer = self.__game_state.get_unit_from_id(engineer_id)
 
-        # Change the tile to BRIDGE
-        self.__game_state.map.tiles[engineer.x][engineer.y] = Tile.BRIDGE
-
-        # Record the map change
-        self.__game_state.changed_maps.append(self.__game_state.map.to_2d_list())
-        self.__game_state.changed_turns.append(self.__game_state.turn)
+        # Change the tile to BRIDGE and record the map change
+        self.__game_state.build_bridge(engineer.x, engineer.y)
 
         # Disband the engineer
         if not self.disband_unit(engineer_id):
-            print("build_bridge(): Failed to disband engineer")
+            self.__game_state.diagnostics.info("build_bridge(): Failed to disband engineer")
             return False
 
         # print(f"Bridge successfully built at ({x}, {y}) by Engineer {engineer_id}")
@@ -1213,11 +1360,11 @@ class RobotController:
 
         # are ids valid?
         if healer_id not in self.__game_state.units[self.__team]:
-            print("can_heal_unit(): invalid attacking_unit_id")
+            self.__game_state.diagnostics.info("can_heal_unit(): invalid attacking_unit_id")
             return False
         
         if target_unit_id not in self.__game_state.units[self.__team]:
-            print("can_heal_unit(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("can_heal_unit(): invalid target_unit_id")
             return False
 
 
@@ -1227,11 +1374,11 @@ class RobotController:
 
         # basic validity
         if healer_unit is None:
-            print('can_heal_unit(): invalid attacking unit id')
+            self.__game_state.diagnostics.info('can_heal_unit(): invalid attacking unit id')
             return False
         
         if target_unit is None:
-            print('can_heal_unit(): invalid target unit id')
+            self.__game_state.diagnostics.info('can_heal_unit(): invalid target unit id')
             return False
         
         #is the healer_unit a healer?
@@ -1258,11 +1405,11 @@ class RobotController:
         
         # are ids valid?
         if healer_id not in self.__game_state.units[self.__team]:
-            print("can_heal_unit(): invalid attacking_unit_id")
+            self.__game_state.diagnostics.info("can_heal_unit(): invalid attacking_unit_id")
             return False
         
         if target_unit_id not in self.__game_state.units[self.__team]:
-            print("can_heal_unit(): invalid target_unit_id")
+            self.__game_state.diagnostics.info("can_heal_unit(): invalid target_unit_id")
             return False
 
 
@@ -1271,11 +1418,11 @@ class RobotController:
 
         # basic validity
         if healer_unit is None:
-            print('can_heal_unit(): invalid attacking unit id')
+            self.__game_state.diagnostics.info('can_heal_unit(): invalid attacking unit id')
             return False
         
         if target_unit is None:
-            print('can_heal_unit(): invalid target unit id')
+            self.__game_state.diagnostics.info('can_heal_unit(): invalid target unit id')
             return False
         
         #unit actions per turn decrement
@@ -1296,29 +1443,29 @@ class RobotController:
         Checks if the ally farm_id is specified
         '''
         if rat_id not in self.__game_state.units[self.__team]:
-            print("can_harm_farm(): invalid rat_id")
+            self.__game_state.diagnostics.info("can_harm_farm(): invalid rat_id")
             return False
 
         rat_unit = self.__game_state.get_unit_from_id(rat_id)
 
         farm_building = self.get_building_from_id(farm_id)
         if farm_building is None:
-            print('can_harm_farm(): farm_id is not a valid farm')
+            self.__game_state.diagnostics.info('can_harm_farm(): farm_id is not a valid farm')
             return False
         
         if farm_building.type not in self.__game_state.FARMS:
-            print('can_harm_farm(): farm_id is not a valid farm')
+            self.__game_state.diagnostics.info('can_harm_farm(): farm_id is not a valid farm')
             return False
         
         if farm_building.team != self.__team:
-            print('can_harm_farm(): can only harm when on an ally farm')
+            self.__game_state.diagnostics.info('can_harm_farm(): can only harm when on an ally farm')
 
         if rat_unit is None or rat_unit.type != UnitType.RAT:
-            print("can_harm_farm(): unit is not a Rat")
+            self.__game_state.diagnostics.info("can_harm_farm(): unit is not a Rat")
             return False
         
         if not (rat_unit.x == farm_building.x and rat_unit.y == farm_building.y):
-            print("can_harm_farm(): target building is not an ally farm")
+            self.__game_state.diagnostics.info("can_harm_farm(): target building is not an ally farm")
             return False
 
         return True
@@ -1341,3 +1488,67 @@ class RobotController:
         # Disband the Rat after effect is applied
         self.disband_unit(rat_id)
         return True
+
+
+    '''
+    ---------------
+    Batched actions
+    ---------------
+    '''
+
+    def perform_actions(self, actions: List[Tuple]) -> List[bool]:
+        '''
+        Applies a list of actions in order and returns one result per action
+        Each action is a tuple (ActionType, *arguments), e.g. (ActionType.MOVE, unit_id, Direction.UP) or
+        (ActionType.SPAWN, UnitType.KNIGHT, castle_id), with the arguments of the matching RobotController method
+
+        Each action goes through its method as if called directly, can_ checks included, so there is no need to call
+        the can_ functions first; later actions see the effects of earlier ones. A result is True if the action was
+        applied, and False if it was rejected, in which case the batch goes on. Malformed actions (not an ActionType,
+        the wrong number of arguments, arguments of the wrong type) are rejected too and reported through diagnostics.
+        '''
+
+        results = []
+        for action in actions:
+            if not (isinstance(action, tuple) and action and isinstance(action[0], ActionType)):
+                self.__game_state.diagnostics.info("perform_actions(): invalid action {}", action)
+                results.append(False)
+                continue
+
+            method = ACTION_METHODS[action[0]]
+            fewest, most = ACTION_ARITY[action[0]]
+            if not fewest <= len(action) - 1 <= most:
+                self.__game_state.diagnostics.info("perform_actions(): wrong number of arguments for {}: {}", action[0].name, action)
+                results.append(False)
+                continue
+
+            #arguments of the wrong type (a str id, a tuple for a Direction, ...) fail inside the method
+            try:
+                results.append(bool(method(self, *action[1:])))
+            except (GameException, TypeError, ValueError, KeyError, AttributeError) as e:
+                self.__game_state.diagnostics.warning("perform_actions(): {} failed: {!r}", action[0].name, e)
+                results.append(False)
+
+        return results
+
+
+def positional_arity(method) -> Tuple[int, float]:
+    '''(fewest, most) positional arguments a RobotController method takes after self, from its signature'''
+    parameters = list(inspect.signature(method).parameters.values())[1:]
+    if any(parameter.kind == inspect.Parameter.VAR_POSITIONAL for parameter in parameters):
+        most = math.inf
+    else:
+        most = sum(parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD) for parameter in parameters)
+    fewest = sum(
+        parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        and parameter.default is inspect.Parameter.empty
+        for parameter in parameters
+    )
+    return fewest, most
+
+
+# RobotController method applying each batched action type
+ACTION_METHODS = {action_type: getattr(RobotController, action_type.value) for action_type in ActionType}
+
+# what Signature.bind would check, worked out once: binding costs about as much as a move
+ACTION_ARITY = {action_type: positional_arity(method) for action_type, method in ACTION_METHODS.items()}
@@ -0,0 +1,35 @@
+''' per game lookup tables for the movement and placement rules, built once from the map and updated on bridge builds '''
+
+from typing import List, Dict, FrozenSet
+
+from src.map import Map
+from src.game_constants import Tile, UnitType, BuildingType
+
+
+class RuleTables:
+    '''
+    Compiled movement and placement rules of one game
+
+    passable[tile_set][x][y] is True if the tile at (x, y) is in tile_set, for every walk class (UnitType.walk_class)
+    and placement class (BuildingType.placement_class); movement_cost[x][y] is the cost of entering (x, y).
+    Both are nested lists indexed like Map.tiles, so a check is two list indexings instead of scanning a tile list
+    and going through the Tile enum. GameState.build_bridge keeps them up to date.
+    '''
+
+    def __init__(self, map: Map):
+        self.width = map.width
+        self.height = map.height
+
+        tile_sets = {unit_type.walk_class for unit_type in UnitType} | {building_type.placement_class for building_type in BuildingType}
+
+        self.passable: Dict[FrozenSet[Tile], List[List[bool]]] = {
+            tile_set: [[map.tiles[x][y] in tile_set for y in range(map.height)] for x in range(map.width)]
+            for tile_set in tile_sets
+        }
+        self.movement_cost: List[List[int]] = [[map.tiles[x][y].movement_cost for y in range(map.height)] for x in range(map.width)]
+
+    def set_tile(self, x: int, y: int, tile: Tile):
+        '''Updates the tables for a tile that changed type'''
+        for tile_set, grid in self.passable.items():
+            grid[x][y] = tile in tile_set
+        self.movement_cost[x][y] = tile.movement_cost
@@ -0,0 +1,77 @@
+''' uniform grid over the map for finding the units or buildings near a location without scanning all of them '''
+
+from typing import List, Dict, Set, Tuple
+
+
+class SpatialIndex:
+    '''
+    Buckets object ids by position into square cells of cell_size x cell_size tiles
+
+    A radius query only looks at the cells overlapping the query square, then filters by exact chebyshev distance.
+    GameState keeps one index per team for units and one for buildings, updated on place, move and delete.
+    '''
+
+    def __init__(self, width: int, height: int, cell_size: int = 4):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+
+        self.columns = (width + cell_size - 1) // cell_size
+        self.rows = (height + cell_size - 1) // cell_size
+
+        self.cells: List[List[Set[int]]] = [[set() for _ in range(self.rows)] for _ in range(self.columns)]
+        self.positions: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, obj_id: int) -> bool:
+        return obj_id in self.positions
+
+    def cell(self, x: int, y: int) -> Set[int]:
+        return self.cells[x // self.cell_size][y // self.cell_size]
+
+    def add(self, obj_id: int, x: int, y: int):
+        self.positions[obj_id] = (x, y)
+        self.cell(x, y).add(obj_id)
+
+    def remove(self, obj_id: int):
+        x, y = self.positions.pop(obj_id)
+        self.cell(x, y).discard(obj_id)
+
+    def move(self, obj_id: int, x: int, y: int):
+        old_x, old_y = self.positions[obj_id]
+        self.positions[obj_id] = (x, y)
+
+        old_cell = self.cell(old_x, old_y)
+        new_cell = self.cell(x, y)
+        if old_cell is not new_cell:
+            old_cell.discard(obj_id)
+            new_cell.add(obj_id)
+
+    def query(self, x: int, y: int, radius: int) -> List[int]:
+        '''
+        Ids of the objects within chebyshev distance radius of (x, y), in increasing id order
+        (the order objects were created in, which is also the order of GameState.units / buildings)
+        '''
+        if radius < 0 or not self.positions:
+            return []
+
+        size = self.cell_size
+        first_column = max(0, (x - radius) // size)
+        last_column = min(self.columns - 1, (x + radius) // size)
+        first_row = max(0, (y - radius) // size)
+        last_row = min(self.rows - 1, (y + radius) // size)
+
+        positions = self.positions
+        found = []
+        for column in range(first_column, last_column + 1):
+            cells = self.cells[column]
+            for row in range(first_row, last_row + 1):
+                for obj_id in cells[row]:
+                    obj_x, obj_y = positions[obj_id]
+                    if abs(obj_x - x) <= radius and abs(obj_y - y) <= radius:
+                        found.append(obj_id)
+
+        found.sort()
+        return found
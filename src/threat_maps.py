@@ -0,0 +1,65 @@
+''' per tile counts of the enemy units and buildings that can hit a tile, and how much damage they can deal there '''
+
+from typing import List, Dict, Tuple
+
+from src.game_constants import Team
+
+
+class ThreatMaps:
+    '''
+    Threat and damage grids of a team, computed on first use and cached until that team's units or buildings change
+
+    A unit or building threatens every tile it can damage with one attack: tiles within chebyshev distance
+    attack_range + damage_range of it. Objects with no damage are left out. The damage grid adds up
+    damage * actions_per_turn of every object threatening a tile, the most the tile can take in one turn.
+
+    Both grids come from one NumPy pass: every object adds its value to the corners of its square in a difference
+    array, and two cumulative sums spread the values over the squares.
+
+    A team's objects only change during the other team's turn by dying or being destroyed, so the cache is keyed
+    on the turn and the unit and building versions of GameState, and never holds a stale grid.
+    '''
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.cache: Dict[Team, Tuple[Tuple[int, int, int], List[List[int]], List[List[int]]]] = {}
+
+    def grids(self, team: Team) -> Tuple[List[List[int]], List[List[int]]]:
+        '''(threat, damage) grids of team, indexed [x][y]'''
+        version = (self.game_state.turn, self.game_state.occupancy_version, self.game_state.building_version)
+        cached = self.cache.get(team)
+        if cached is None or cached[0] != version:
+            cached = (version, *self.compute(team))
+            self.cache[team] = cached
+        return cached[1], cached[2]
+
+    def compute(self, team: Team) -> Tuple[List[List[int]], List[List[int]]]:
+        import numpy as np
+
+        width, height = self.game_state.map.width, self.game_state.map.height
+
+        attackers = [
+            (obj.x, obj.y, obj.attack_range + obj.damage_range, obj.damage * obj.type.actions_per_turn)
+            for objects in (self.game_state.units[team], self.game_state.buildings[team])
+            for obj in objects.values() if obj.damage > 0
+        ]
+        if not attackers:
+            empty = [[0] * height for _ in range(width)]
+            return empty, [column[:] for column in empty]
+
+        x, y, reach, damage = np.array(attackers, dtype=np.int64).T
+        low_x, high_x = np.maximum(x - reach, 0), np.minimum(x + reach, width - 1) + 1
+        low_y, high_y = np.maximum(y - reach, 0), np.minimum(y + reach, height - 1) + 1
+
+        #one extra row and column so the corners past the far edges have somewhere to go
+        corners_x = np.concatenate([low_x, low_x, high_x, high_x])
+        corners_y = np.concatenate([low_y, high_y, low_y, high_y])
+        signs = np.concatenate([np.ones_like(x), -np.ones_like(x), -np.ones_like(x), np.ones_like(x)])
+
+        grids = []
+        for values in (np.ones_like(x), damage):
+            difference = np.zeros((width + 1, height + 1), dtype=np.int64)
+            np.add.at(difference, (corners_x, corners_y), signs * np.tile(values, 4))
+            grids.append(difference.cumsum(axis=0).cumsum(axis=1)[:width, :height].tolist())
+
+        return grids[0], grids[1]
@@ -0,0 +1,197 @@
+''' runs many games in parallel over a process pool and aggregates the results '''
+
+import os
+import io
+import json
+import time
+import contextlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional
+
+from src.game import Game
+from src.game_constants import Team, GameConstants
+from src.result_cache import ResultCache
+
+
+def bot_name(path: str) -> str:
+    '''Name of a bot or map given its file path (file name without extension)'''
+    return os.path.basename(path).split(".")[0]
+
+
+def make_matches(bot_paths: List[str], map_paths: List[str], rounds: int) -> List[Tuple[str, str, str, int]]:
+    '''
+    Every ordered pairing of two different bots on every map, repeated for a number of rounds
+    Each bot plays both colors against every other bot
+
+    Returns a list of (blue_path, red_path, map_path, round)
+    '''
+    matches = []
+
+    for round_number in range(rounds):
+        for map_path in map_paths:
+            for blue_path, red_path in itertools.permutations(bot_paths, 2):
+                matches.append((blue_path, red_path, map_path, round_number))
+
+    return matches
+
+
+def play_match(match: Tuple[str, str, str, int], replay_dir: str, isolate_bots: bool = False, quiet: bool = True,
+               cache_dir: Optional[str] = None) -> Dict:
+    '''
+    Plays a single game in the current process and returns its result record
+    This is the function that runs inside each pool worker
+
+    With a cache_dir, a game whose bots, map and engine are unchanged since it was last played is not played
+    again: its stored result and replay are used instead
+    '''
+    blue_path, red_path, map_path, round_number = match
+
+    output_path = os.path.join(
+        replay_dir, f"{bot_name(blue_path)}_vs_{bot_name(red_path)}_{bot_name(map_path)}_{round_number}.awap25r"
+    )
+
+    cache = None
+    if cache_dir is not None:
+        cache = ResultCache(cache_dir)
+        #rounds of the same matchup are cached separately so repeated rounds still sample bots that use randomness
+        key = cache.key(blue_path, red_path, map_path, {"isolate_bots": isolate_bots, "round": round_number})
+
+        start = time.perf_counter()
+        cached = cache.get(key, output_path)
+        if cached is not None:
+            cached.update(wall_time=time.perf_counter() - start, replay=output_path, cached=True)
+            return cached
+
+    #bots and the engine print a lot; keep worker output from interleaving
+    sink = io.StringIO() if quiet else None
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+        try:
+            game = Game(
+                blue_path=blue_path, red_path=red_path, map_path=map_path, output_path=output_path, isolate_bots=isolate_bots
+            )
+            winner = game.run_game()
+            error = None
+        except Exception as e:
+            game = None
+            winner = None
+            error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - start
+
+    result = {
+        "blue": bot_name(blue_path),
+        "red": bot_name(red_path),
+        "map": bot_name(map_path),
+        "round": round_number,
+        "winner": winner.name if winner is not None else None,
+        "turns": 0,
+        "time_used": {Team.BLUE.name: 0.0, Team.RED.name: 0.0},
+        "wall_time": wall_time,
+        "replay": output_path if game is not None else None,
+        "error": error,
+    }
+
+    if game is not None:
+        turns = game.game_state.turn
+        result["turns"] = turns
+
+        #every team is granted the same pool plus a fixed amount per turn
+        time_granted = GameConstants.INITIAL_TIME_POOL + turns * GameConstants.ADDITIONAL_TIME_PER_TURN
+        for team in Team:
+            result["time_used"][team.name] = time_granted - game.game_state.time_remaining[team]
+
+        #engine vs bot wall time, to tell slow bots from slow engine bookkeeping
+        result["phase_time"] = dict(game.metrics.totals)
+
+        #why actions were rejected, over the whole game
+        result["rejections"] = dict(game.game_state.diagnostics.counts)
+
+    result["cached"] = False
+    if cache is not None and error is None:
+        cache.put(key, result, output_path)
+
+    return result
+
+
+def summarize(results: List[Dict]) -> Dict[str, Dict]:
+    '''Aggregates per-game results into per-bot totals'''
+
+    summary: Dict[str, Dict] = {}
+
+    def entry(name: str) -> Dict:
+        if name not in summary:
+            summary[name] = {"games": 0, "wins": 0, "losses": 0, "errors": 0, "turns": 0, "time_used": 0.0}
+        return summary[name]
+
+    for result in results:
+        for team in Team:
+            name = result[team.name.lower()]
+            record = entry(name)
+
+            record["games"] += 1
+            record["turns"] += result["turns"]
+            record["time_used"] += result["time_used"][team.name]
+
+            if result["error"] is not None:
+                record["errors"] += 1
+            elif result["winner"] == team.name:
+                record["wins"] += 1
+            elif result["winner"] is not None:
+                record["losses"] += 1
+
+    return summary
+
+
+def run_tournament(bot_paths: List[str], map_paths: List[str], rounds: int= 1, workers: Optional[int]= None,
+                   replay_dir: str= "replays/tournament", output_path: Optional[str]= None, isolate_bots: bool= False,
+                   cache_dir: Optional[str]= None) -> Dict:
+    '''
+    Plays every match over a process pool sized to the machine and writes one aggregated results file
+    With isolate_bots, every bot also runs in its own subprocess so a runaway bot cannot slow down other games
+    With cache_dir, matches whose inputs are unchanged reuse their stored result instead of being played
+
+    Returns the aggregated results
+    '''
+    if len(bot_paths) < 2:
+        raise ValueError("A tournament needs at least two bots")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    os.makedirs(replay_dir, exist_ok=True)
+
+    matches = make_matches(bot_paths, map_paths, rounds)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        #chunksize 1 since games have very uneven lengths
+        results = list(pool.map(
+            play_match, matches, itertools.repeat(replay_dir), itertools.repeat(isolate_bots), itertools.repeat(True),
+            itertools.repeat(cache_dir), chunksize=1
+        ))
+    elapsed = time.perf_counter() - start
+
+    data = {
+        "bots": [bot_name(path) for path in bot_paths],
+        "maps": [bot_name(path) for path in map_paths],
+        "rounds": rounds,
+        "workers": workers,
+        "games": len(results),
+        "elapsed": elapsed,
+        "games_per_second": len(results) / elapsed if elapsed > 0 else 0.0,
+        "cached": sum(1 for result in results if result.get("cached")),
+        "summary": summarize(results),
+        "results": results,
+    }
+
+    if output_path is not None:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with open(output_path, 'w') as f:
+            json.dump(data, f, indent=4)
+
+    return data
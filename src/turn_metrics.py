@@ -0,0 +1,87 @@
+''' times each phase of a turn (engine bookkeeping vs bot code) to find where a slow game spends its time '''
+
+import json
+import time
+from typing import Dict, Optional, IO
+
+
+# the phases of Game.run_turn, in order
+PHASES = ["start_turn", "blue", "red", "serialization"]
+
+
+class TurnMetrics:
+    '''
+    Accumulates wall time per phase of every turn
+
+    Call begin_turn, then lap(phase) as each phase ends; end_turn charges the rest of the turn to its last phase.
+    With a path, every turn is also written as one JSON line ({"turn": ..., phase: seconds, ...}) to that sidecar
+    file, followed by a summary line when the game ends.
+    '''
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.file: Optional[IO] = open(path, 'w') if path is not None else None
+
+        self.totals: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.maxima: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.turns = 0
+
+        self.current: Dict[str, float] = {}
+        self.last = 0.0
+
+    def begin_turn(self):
+        self.current = {}
+        self.last = time.perf_counter()
+
+    def lap(self, phase: str):
+        '''Ends a phase of the current turn'''
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def end_turn(self, turn: int, phase: str = PHASES[-1]):
+        '''Ends the current turn, charging the time since the last lap to phase'''
+        self.lap(phase)
+        self.turns += 1
+
+        for name, seconds in self.current.items():
+            self.totals[name] += seconds
+            self.maxima[name] = max(self.maxima[name], seconds)
+
+        if self.file is not None:
+            self.file.write(json.dumps({"turn": turn, **self.current}) + "\n")
+
+    def summary(self) -> Dict:
+        '''Total, mean and worst turn time of each phase, and each phase's share of the total'''
+
+        total = sum(self.totals.values())
+        return {
+            "turns": self.turns,
+            "total": total,
+            "phases": {
+                phase: {
+                    "total": self.totals[phase],
+                    "mean": self.totals[phase] / self.turns if self.turns else 0.0,
+                    "max": self.maxima[phase],
+                    "share": self.totals[phase] / total if total > 0 else 0.0,
+                }
+                for phase in PHASES
+            },
+        }
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = [f"Turn timings over {summary['turns']} turns ({summary['total']:.3f}s):"]
+        for phase, stats in summary["phases"].items():
+            lines.append(
+                f"  {phase:>13}: {stats['total']:8.3f}s total, {stats['mean'] * 1e6:9.1f} us/turn, "
+                f"{stats['max'] * 1000:8.2f} ms worst, {stats['share'] * 100:5.1f}%"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        '''Writes the summary line and closes the sidecar file'''
+        if self.file is not None:
+            self.file.write(json.dumps({"summary": self.summary()}) + "\n")
+            self.file.close()
+            self.file = None
@@ -0,0 +1,129 @@
+''' read-only views of units and buildings handed to player code instead of deep copies '''
+
+import copy
+from typing import List, Optional, Iterable
+
+from src.exceptions import GameException
+from src.units import Unit
+from src.buildings import Building
+
+
+def object_snapshot(obj) -> tuple:
+    '''The class and attribute values a view of obj shows; objects backed by an EntityStore build their own'''
+    if type(obj) is Unit or type(obj) is Building:
+        return type(obj), obj.__dict__.copy()
+    return obj.view_snapshot()
+
+
+def restore_object(cls: type, values: dict):
+    '''Builds a plain, mutable object of class cls from a view's values'''
+    obj = cls.__new__(cls)
+    obj.__dict__.update(values)
+    return obj
+
+
+class ObjectView(tuple):
+    '''
+    A read-only snapshot of an engine object: attribute reads work as on the object, writes raise GameException
+
+    Like the deep copies it replaces, a view shows the values the object had when it was returned, so bots that
+    keep it while moving or attacking see the same thing as before. Only the object's attribute dict is copied
+    (a shallow copy of a dozen ints and enum references); the enums and tile lists are shared, and list fields
+    are returned as tuples so they cannot be edited.
+
+    isinstance(view, Unit) (or Building) still holds, and copy.copy / copy.deepcopy of a view give an independent,
+    mutable object as before. A view is a (class, values) tuple, the cheapest object Python can build.
+    '''
+
+    __slots__ = ()
+
+    def __new__(cls, obj):
+        return tuple.__new__(cls, object_snapshot(obj))
+
+    #compare and hash by identity, as the copies did
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+    def __setattr__(self, name, value):
+        raise GameException(f"Cannot set {name}: {self.__class__.__name__} objects returned by the RobotController are read-only")
+
+    def __delattr__(self, name):
+        raise GameException(f"Cannot delete {name}: {self.__class__.__name__} objects returned by the RobotController are read-only")
+
+    @property
+    def __class__(self):
+        #makes isinstance checks against Unit / Building see the viewed class
+        return tuple.__getitem__(self, 0)
+
+    def __copy__(self):
+        return restore_object(tuple.__getitem__(self, 0), copy.deepcopy(tuple.__getitem__(self, 1)))
+
+    def __deepcopy__(self, memo):
+        return restore_object(tuple.__getitem__(self, 0), copy.deepcopy(tuple.__getitem__(self, 1), memo))
+
+    def __reduce__(self):
+        #pickles as the plain object
+        return (restore_object, (tuple.__getitem__(self, 0), tuple.__getitem__(self, 1)))
+
+    def __repr__(self):
+        return f"<read-only {self.__class__.__name__} {self.id}>"
+
+    def to_dict(self):
+        return self.__class__.to_dict(self)
+
+
+def add_fields(view_class: type, fields: List[str], list_fields: List[str]):
+    '''Generates a read-only property per whitelisted field; list fields are returned as tuples so they cannot be edited'''
+
+    for field in fields:
+        setattr(view_class, field, property(lambda self, field=field: tuple.__getitem__(self, 1)[field]))
+
+    for field in list_fields:
+        setattr(view_class, field, property(lambda self, field=field: tuple(tuple.__getitem__(self, 1)[field])))
+
+
+#builds a view without going through ObjectView.__new__
+make_view = tuple.__new__
+
+
+class UnitView(ObjectView):
+    '''Read-only view of a Unit'''
+    __slots__ = ()
+
+
+class BuildingView(ObjectView):
+    '''Read-only view of a Building'''
+    __slots__ = ()
+
+
+add_fields(UnitView, [
+    "id", "team", "type", "x", "y", "turn_actions_remaining", "turn_movement_remaining",
+    "attack_range", "health", "damage", "defense", "damage_range", "level"
+], ["walkable_tiles"])
+
+add_fields(BuildingView, [
+    "id", "team", "type", "x", "y", "health", "damage", "defense",
+    "attack_range", "damage_range", "turn_actions_remaining", "level", "spawnable"
+], ["placeable_tiles"])
+
+
+def unit_views(units: Iterable[Unit]) -> List[UnitView]:
+    '''Views of many units; builds the tuples directly, which halves the cost of going through UnitView()'''
+    return [make_view(UnitView, (Unit, unit.__dict__.copy()) if type(unit) is Unit else unit.view_snapshot()) for unit in units]
+
+
+def building_views(buildings: Iterable[Building]) -> List[BuildingView]:
+    '''Views of many buildings'''
+    return [
+        make_view(BuildingView, (Building, building.__dict__.copy()) if type(building) is Building else building.view_snapshot())
+        for building in buildings
+    ]
+
+
+def unit_view(unit: Optional[Unit]) -> Optional[UnitView]:
+    return UnitView(unit) if unit is not None else None
+
+
+def building_view(building: Optional[Building]) -> Optional[BuildingView]:
+    return BuildingView(building) if building is not None else None
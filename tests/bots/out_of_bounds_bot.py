@@ -0,0 +1,15 @@
+''' test bot: asks about an out of bounds tile three times every turn, and does nothing else '''
+
+from src.player import Player
+from src.map import Map
+from src.robot_controller import RobotController
+from src.game_constants import BuildingType
+
+
+class BotPlayer(Player):
+    def __init__(self, map: Map):
+        pass
+
+    def play_turn(self, rc: RobotController):
+        for _ in range(3):
+            rc.can_build_building(BuildingType.FARM_1, -1, -1)
@@ -0,0 +1,24 @@
+''' test bot: writes what the static tables tell it every turn to the file in TABLE_PROBE_PATH, and does nothing else '''
+
+import os
+import zlib
+
+from src.player import Player
+from src.map import Map
+from src.robot_controller import RobotController
+from src.game_constants import UnitType
+
+
+class BotPlayer(Player):
+    def __init__(self, map: Map):
+        self.path = os.environ["TABLE_PROBE_PATH"]
+
+    def play_turn(self, rc: RobotController):
+        game_map = rc.get_map()
+        team = rc.get_ally_team()
+        seen = [
+            (rc.get_region_size(UnitType.KNIGHT, x, y), rc.get_castle_distance(team, UnitType.KNIGHT, x, y))
+            for x in range(game_map.width) for y in range(game_map.height)
+        ]
+        with open(self.path, "a") as f:
+            f.write(f"{zlib.crc32(repr(seen).encode())}\n")
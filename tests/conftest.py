@@ -0,0 +1,61 @@
+''' shared setup for the engine tests; run from the repository root with python -m pytest '''
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.units import Unit
+from src.buildings import Building
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    '''Bots and maps are given by paths relative to the repository root; ids start from 0 in every test'''
+    monkeypatch.chdir(ROOT)
+    Unit.id_counter = 0
+    Building.id_counter = 0
+
+
+@pytest.fixture
+def play_replay(tmp_path):
+    '''Plays a game and returns its replay, expanded to full turns and without what differs between runs'''
+    from src.game import Game
+    from src.replay import expand_replay
+
+    def play(blue: str, red: str, map_name: str, turn_limit: int = None, **options) -> dict:
+        Unit.id_counter = 0
+        Building.id_counter = 0
+        output_path = tmp_path / "game.awap25r"
+        game = Game(
+            blue_path=f"bots/{blue}.py", red_path=f"bots/{red}.py", map_path=f"maps/{map_name}.awap25m",
+            output_path=str(output_path), **options
+        )
+        if turn_limit is not None:
+            game.turn_limit = turn_limit
+        game.run_game()
+
+        with open(output_path) as f:
+            replay = expand_replay(json.load(f))
+        replay.pop("ID") #random per game
+        for turn in replay["replay"]:
+            if "game_state" in turn:
+                turn["game_state"].pop("time_remaining", None) #wall clock
+        return replay
+
+    return play
+
+
+@pytest.fixture
+def skirmish():
+    '''Builds a crowded random skirmish on simple_map (src/attack_scenarios.py) over plain objects or columnar'''
+    from src.attack_scenarios import attack_scenario
+
+    def build(columnar: bool, seed: int, max_damage_range: int):
+        return attack_scenario("maps/simple_map.awap25m", columnar, seed, max_damage_range)
+
+    return build
@@ -0,0 +1,36 @@
+''' columnar games play out exactly like games over plain objects '''
+
+import random
+
+import pytest
+
+from src.attack_scenarios import attack_state
+from src.robot_controller import RobotController
+from src.game_constants import Team
+
+
+@pytest.mark.parametrize("batch_min_hits", [0, None], ids=["always-batched", "default"])
+@pytest.mark.parametrize("seed", range(6))
+def test_attacks_match_objects(skirmish, seed, batch_min_hits):
+    game_states = {columnar: skirmish(columnar, seed, max_damage_range=8) for columnar in (False, True)}
+    if batch_min_hits is not None:
+        game_states[True].BATCH_ATTACK_MIN_HITS = batch_min_hits
+    controllers = {columnar: {team: RobotController(team, game_state) for team in Team} for columnar, game_state in game_states.items()}
+    reference = game_states[False]
+    rng = random.Random(seed)
+
+    for step in range(60):
+        team = rng.choice(list(Team))
+        if not reference.units[team]:
+            break
+        if step % 10 == 9:
+            for game_state in game_states.values():
+                game_state.start_turn()
+
+        unit = reference.units[team][rng.choice(list(reference.units[team]))]
+        x = unit.x + rng.randint(-unit.attack_range, unit.attack_range)
+        y = unit.y + rng.randint(-unit.attack_range, unit.attack_range)
+
+        results = [controllers[columnar][team].unit_attack_location(unit.id, x, y) for columnar in (False, True)]
+        assert results[0] == results[1]
+        assert attack_state(game_states[True]) == attack_state(reference), f"attack {step} by unit {unit.id} on ({x}, {y})"
@@ -0,0 +1,23 @@
+''' the pathfinder's caches stay bounded over a long game '''
+
+from src.game_constants import UnitType
+from src.game_state import GameState
+from src.map_processor import process_map
+from src.pathfinding import FLOW_FIELD_CACHE_SIZE
+
+
+def test_flow_field_cache_keeps_the_most_recently_used():
+    game_state = GameState(process_map("maps/simple_map.awap25m"))
+    pathfinder = game_state.pathfinder
+    walk_class = UnitType.KNIGHT.walk_class
+    targets = [(x, y) for x in range(game_state.map.width) for y in range(game_state.map.height)]
+    assert len(targets) > 2 * FLOW_FIELD_CACHE_SIZE
+
+    first = pathfinder.flow_field(walk_class, *targets[0])
+    for x, y in targets[1:]:
+        #a target asked for every turn stays cached while the others come and go
+        assert pathfinder.flow_field(walk_class, *targets[0]) is first
+        pathfinder.flow_field(walk_class, x, y)
+        assert len(pathfinder.flow_fields) <= FLOW_FIELD_CACHE_SIZE
+
+    assert (walk_class, targets[1][0] * game_state.map.height + targets[1][1]) not in pathfinder.flow_fields
@@ -0,0 +1,73 @@
+''' batched actions: invalid and malformed ones are rejected and reported without stopping the batch '''
+
+import pytest
+
+from src.game import process_map
+from src.game_state import GameState
+from src import robot_controller
+from src.robot_controller import RobotController
+from src.game_constants import Team, UnitType, Direction, ActionType
+
+
+@pytest.fixture
+def knight():
+    game_state = GameState(process_map("maps/simple_map.awap25m"))
+    x, y = next(
+        (x, y) for x in range(1, game_state.map.width - 1) for y in range(1, game_state.map.height - 1)
+        if game_state.is_unit_placeable(UnitType.KNIGHT, x, y) and game_state.is_unit_placeable(UnitType.KNIGHT, x + 1, y)
+    )
+    game_state.place_unit(Team.BLUE, UnitType.KNIGHT, x, y)
+    game_state.start_turn()
+    unit = next(iter(game_state.units[Team.BLUE].values()))
+    return RobotController(Team.BLUE, game_state), unit, game_state.diagnostics
+
+
+def test_wrong_arguments_are_rejected_and_the_batch_goes_on(knight):
+    rc, unit, diagnostics = knight
+    x = unit.x
+
+    results = rc.perform_actions([
+        (ActionType.MOVE, unit.id),
+        (ActionType.MOVE, unit.id, Direction.RIGHT, 1),
+        ("move", unit.id, Direction.RIGHT),
+        (ActionType.MOVE, unit.id, Direction.RIGHT),
+    ])
+
+    assert results == [False, False, False, True]
+    assert unit.x == x + 1
+
+
+def test_unhashable_action_types_are_rejected(knight):
+    rc, unit, diagnostics = knight
+
+    results = rc.perform_actions([([ActionType.MOVE], unit.id, Direction.RIGHT), (ActionType.MOVE, unit.id, Direction.RIGHT)])
+
+    assert results == [False, True]
+
+
+@pytest.mark.parametrize("action", [
+    (ActionType.MOVE, [0], Direction.RIGHT), #unhashable id
+    (ActionType.MOVE, 0, "right"), #not a Direction
+    (ActionType.MOVE, 0, None),
+], ids=["list-id", "str-direction", "none-direction"])
+def test_arguments_of_the_wrong_type_are_reported_and_the_batch_goes_on(knight, action):
+    rc, unit, diagnostics = knight
+    x = unit.x
+    action = tuple(unit.id if argument == 0 else argument for argument in action)
+
+    results = rc.perform_actions([action, (ActionType.MOVE, unit.id, Direction.RIGHT)])
+
+    assert results == [False, True]
+    assert unit.x == x + 1
+    assert diagnostics.counts["perform_actions(): {} failed: {!r}"] == 1
+
+
+def test_errors_inside_an_action_are_reported(knight, monkeypatch):
+    rc, unit, diagnostics = knight
+
+    def broken(self, unit_id, direction):
+        raise TypeError("engine bug")
+
+    monkeypatch.setitem(robot_controller.ACTION_METHODS, ActionType.MOVE, broken)
+    assert rc.perform_actions([(ActionType.MOVE, unit.id, Direction.RIGHT)]) == [False]
+    assert diagnostics.counts["perform_actions(): {} failed: {!r}"] == 1
@@ -0,0 +1,93 @@
+''' bot workers end with their game and do not keep it alive '''
+
+import gc
+import threading
+import weakref
+
+from src.game import Game
+from src.units import Unit
+from src.buildings import Building
+
+
+def test_thread_workers_stop_and_release_the_game(tmp_path):
+    game = Game(
+        blue_path="bots/nothing_bot.py", red_path="bots/nothing_bot.py", map_path="maps/simple_map.awap25m",
+        output_path=str(tmp_path / "game.awap25r")
+    )
+    game.turn_limit = 5
+    threads = [worker.thread for worker in game.workers.values()]
+    assert len(threads) == 2 and all(thread.is_alive() for thread in threads)
+
+    game.run_game()
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert all(worker.player is None and worker.controller is None for worker in game.workers.values())
+
+    game_state = weakref.ref(game.game_state)
+    del game
+    gc.collect()
+    assert game_state() is None
+
+
+def test_many_games_do_not_accumulate_threads(tmp_path):
+    before = threading.active_count()
+    for _ in range(4):
+        game = Game(
+            blue_path="bots/nothing_bot.py", red_path="bots/nothing_bot.py", map_path="maps/simple_map.awap25m",
+            output_path=str(tmp_path / "game.awap25r")
+        )
+        game.turn_limit = 3
+        game.run_game()
+    assert threading.active_count() == before
+
+
+def test_isolated_bots_see_the_map_after_bridges(tmp_path, monkeypatch):
+    #static tables are only sent to bot processes when the map changed; blue builds bridges on batsignal
+    seen = {}
+    for isolate_bots in (False, True):
+        probe_path = tmp_path / f"probe-{isolate_bots}.txt"
+        monkeypatch.setenv("TABLE_PROBE_PATH", str(probe_path))
+        Unit.id_counter = 0
+        Building.id_counter = 0
+        game = Game(
+            blue_path="bots/DanielsSexy.py", red_path="tests/bots/table_probe_bot.py", map_path="maps/batsignal.awap25m",
+            output_path=str(tmp_path / "game.awap25r"), isolate_bots=isolate_bots
+        )
+        game.run_game()
+        seen[isolate_bots] = probe_path.read_text().split()
+
+    assert game.game_state.map.version > 0
+    assert len(set(seen[False])) > 1
+    assert seen[True] == seen[False]
+
+
+def test_snapshot_leaves_out_static_tables():
+    from src.game import process_map
+    from src.game_state import GameState
+
+    game_state = GameState(process_map("maps/simple_map.awap25m"))
+    snapshot = game_state.snapshot()
+    assert not set(GameState.STATIC_TABLES) & set(snapshot)
+
+    rebuilt = GameState.from_snapshot(snapshot, game_state.static_tables())
+    assert rebuilt.castle_distances is game_state.castle_distances
+    assert rebuilt.pathfinder.game_state is rebuilt
+
+
+def test_isolated_bots_share_the_rate_limit_and_report_counts(tmp_path, capfd):
+    from src.diagnostics import Level
+
+    message = "can_build_building(): (x, y) given are out of bounds"
+    for isolate_bots in (False, True):
+        game = Game(
+            blue_path="bots/nothing_bot.py", red_path="tests/bots/out_of_bounds_bot.py", map_path="maps/simple_map.awap25m",
+            output_path=str(tmp_path / "game.awap25r"), isolate_bots=isolate_bots, diagnostics_level=Level.INFO
+        )
+        game.turn_limit = 20
+        capfd.readouterr()
+        game.run_game()
+
+        lines = capfd.readouterr().out.splitlines()
+        assert lines.count(message) == game.game_state.diagnostics.limit
+        assert lines.count(f"(not showing '{message}' again this game)") == 1
+        assert game.game_state.diagnostics.counts == {message: 60}
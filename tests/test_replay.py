@@ -0,0 +1,64 @@
+''' replays match the ones the engine wrote before the performance work, whatever the recording mode '''
+
+import hashlib
+import json
+
+import pytest
+
+
+# sha256 of the replay (ID and time_remaining left out, keys sorted) written by the engine at commit bd6caef
+BASELINE_REPLAYS = {
+    ("DanielsCode", "SamsonsDeepAttempt", "simple_map"): "ab466ed95afbc639a76d2f1917e7cfd78bd8ae248871d486df498d9043587c30",
+    ("attack_bot_v1", "attack_bot_v2", "simple_map"): "abcc8321b4c46050a046334bd9c18846ce1b7ab6acd57f632499a9e9cfaf3a03",
+    ("SamsonsCatadeepAttempt", "DanielsSexy", "east_west"): "2cf9361fd4c3f6061b10dc10b9f08a74ac184a9bca2cddb5533630c8969ac179",
+    ("DanielsSexy", "nothing_bot", "batsignal"): "89e443657ffafd565de5c7c3bce33224b5b3b98fc55f47296a29ba3f2804086c", # builds bridges
+}
+
+MODES = {
+    "full": {},
+    "delta": {"replay_format": "delta"},
+    "stream": {"stream_replay": True},
+    "stream-delta": {"stream_replay": True, "replay_format": "delta"},
+    "columnar": {"columnar": True},
+}
+
+
+def digest(replay: dict) -> str:
+    return hashlib.sha256(json.dumps(replay, sort_keys=True).encode()).hexdigest()
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("game", BASELINE_REPLAYS, ids="-".join)
+def test_replay_matches_baseline(play_replay, game, mode):
+    assert digest(play_replay(*game, **MODES[mode])) == BASELINE_REPLAYS[game]
+
+
+def test_isolated_replay_matches_baseline(play_replay):
+    game = ("DanielsCode", "SamsonsDeepAttempt", "simple_map")
+    assert digest(play_replay(*game, isolate_bots=True)) == BASELINE_REPLAYS[game]
+
+
+@pytest.mark.parametrize("mode", ["full", "delta", "stream-delta"])
+def test_last_turn_shows_destroyed_castle(play_replay, mode):
+    #red's castle falls; the popped deciding turn leaves the turn before it showing red's buildings at 0 health
+    replay = play_replay("DanielsCode", "SamsonsDeepAttempt", "simple_map", **MODES[mode])
+    assert replay["winner_color"] == "BLUE"
+
+    *_, before_last, last = replay["replay"]
+    assert all(building["health"] == 0 for building in last["game_state"]["buildings"]["RED"])
+    assert all(building["health"] > 0 for building in before_last["game_state"]["buildings"]["RED"])
+
+
+def test_streamed_map_changes_are_not_kept_in_memory(tmp_path):
+    from src.game import Game
+
+    game = Game(
+        blue_path="bots/DanielsSexy.py", red_path="bots/nothing_bot.py", map_path="maps/batsignal.awap25m",
+        output_path=str(tmp_path / "game.awap25r"), stream_replay=True
+    )
+    game.run_game()
+
+    assert game.game_state.map.version > 0
+    assert game.game_state.changed_maps == [] and game.game_state.changed_turns == []
+    with open(tmp_path / "game.awap25r") as f:
+        assert len(json.load(f)["map-changes"]["changed-maps"]) == game.game_state.map.version
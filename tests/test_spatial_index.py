@@ -0,0 +1,61 @@
+''' the spatial indexes and id maps of GameState agree with the units and buildings as they move, spawn and die '''
+
+import random
+
+import pytest
+
+from src.robot_controller import RobotController
+from src.game_constants import Team, Direction
+
+
+def brute_force(objects: dict, x: int, y: int, radius: int) -> list:
+    return sorted(obj.id for obj in objects.values() if max(abs(obj.x - x), abs(obj.y - y)) <= radius)
+
+
+def check_consistent(game_state, rng: random.Random):
+    for objects_by_team, indexes, id_map in [
+        (game_state.units, game_state.unit_index, game_state.unit_id_map),
+        (game_state.buildings, game_state.building_index, game_state.building_id_map),
+    ]:
+        on_map = {
+            (x, y): obj_id for x, column in enumerate(id_map) for y, obj_id in enumerate(column) if obj_id is not None
+        }
+        assert on_map == {(obj.x, obj.y): obj.id for objects in objects_by_team.values() for obj in objects.values()}
+
+        for team, objects in objects_by_team.items():
+            assert len(indexes[team]) == len(objects)
+            assert all(obj_id in indexes[team] for obj_id in objects)
+
+            for _ in range(5):
+                x, y = rng.randrange(game_state.map.width), rng.randrange(game_state.map.height)
+                radius = rng.randrange(6)
+                assert indexes[team].query(x, y, radius) == brute_force(objects, x, y, radius)
+
+    for x, y in {(unit.x, unit.y) for units in game_state.units.values() for unit in units.values()}:
+        assert not game_state.unit_placeable_map[x][y]
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["objects", "columnar"])
+@pytest.mark.parametrize("seed", range(3))
+def test_indexes_follow_moves_and_deaths(skirmish, seed, columnar):
+    game_state = skirmish(columnar, seed, max_damage_range=3)
+    controllers = {team: RobotController(team, game_state) for team in Team}
+    rng = random.Random(seed)
+    check_consistent(game_state, rng)
+
+    for step in range(150):
+        team = rng.choice(list(Team))
+        if not game_state.units[team]:
+            break
+        if step % 10 == 9:
+            game_state.start_turn()
+
+        unit = game_state.units[team][rng.choice(list(game_state.units[team]))]
+        if rng.random() < 0.5:
+            controllers[team].move_unit_in_direction(unit.id, rng.choice(list(Direction)))
+        else:
+            x = unit.x + rng.randint(-unit.attack_range, unit.attack_range)
+            y = unit.y + rng.randint(-unit.attack_range, unit.attack_range)
+            controllers[team].unit_attack_location(unit.id, x, y)
+
+        check_consistent(game_state, rng)